@@ -1,5 +1,6 @@
 #import random module
 import random
+import numpy as np
 
 def main():
     pass
@@ -34,42 +35,289 @@ def split_training_testing(data, test_percent):
     return training, testing
 
 
+#the splitters below return indices instead of copies and leave the data untouched
+#seed can be None, an integer or a numpy Generator
+def holdout_indices(n_samples, test_percent, seed=None):
+    """
+    Returns the indices of the training and testing sets for n_samples data points,
+    in random order. Test_percent determines how much data is allocated to testing
+    (takes for input a number between 0-100), with the same test size as split_training_testing.
+    Both arrays are views of one permutation.
+    """
+    assert isinstance(n_samples, (int, np.integer)) and n_samples > 0, "Number of samples must be a positive integer."
+    assert isinstance(test_percent, (int, float)), "Input should be a number (int or float)."
+    assert 0 <= test_percent <= 100, "Input number must be between 0 and 100"
+
+    rng = np.random.default_rng(seed)
+    test_size = int(n_samples * test_percent / 100)
+    permutation = rng.permutation(n_samples)
+    return permutation[test_size:], permutation[:test_size]
+
+def stratified_holdout_indices(labels, test_percent, seed=None):
+    """
+    Returns the indices of the training and testing sets, in random order, so that every
+    class of labels has (as near as possible) the same share in the testing set as in the data.
+    The testing set has the same size as with holdout_indices.
+    """
+    labels = np.asarray(labels)
+    assert labels.ndim == 1 and len(labels) > 0, "Input labels must be a non-empty list or 1-D array"
+    assert isinstance(test_percent, (int, float)), "Input should be a number (int or float)."
+    assert 0 <= test_percent <= 100, "Input number must be between 0 and 100"
+
+    rng = np.random.default_rng(seed)
+    n_samples = len(labels)
+    test_size = int(n_samples * test_percent / 100)
+    _, codes, class_counts = np.unique(labels, return_inverse=True, return_counts=True)
+
+    #share out the test size over the classes, the remainder going to the largest fractions
+    quotas = class_counts * test_percent / 100
+    class_test = np.floor(quotas).astype(np.int64)
+    remainder = test_size - class_test.sum()
+    if remainder > 0:
+        class_test[np.argsort(class_test - quotas, kind='stable')[:remainder]] += 1
+
+    #shuffle, then group by class: the first class_test indices of each group are tested
+    order = rng.permutation(n_samples)
+    order = order[np.argsort(codes[order], kind='stable')]
+    starts = np.concatenate(([0], np.cumsum(class_counts)[:-1]))
+    sorted_codes = codes[order]
+    is_test = np.arange(n_samples) - starts[sorted_codes] < class_test[sorted_codes]
+
+    training, testing = order[~is_test], order[is_test]
+    rng.shuffle(training)
+    rng.shuffle(testing)
+    return training, testing
+
+def kfold_indices(n_samples, k, seed=None, shuffle=True):
+    """
+    Yields the indices of the training and testing sets of each of the k folds, one fold at a time.
+    The fold sizes differ by at most one. The testing indices are a view of one permutation
+    (of range(n_samples) when shuffle is False).
+    """
+    assert isinstance(n_samples, (int, np.integer)) and n_samples > 0, "Number of samples must be a positive integer."
+    assert isinstance(k, (int, np.integer)) and 2 <= k <= n_samples, "k must be an integer between 2 and the number of samples"
+
+    permutation = np.random.default_rng(seed).permutation(n_samples) if shuffle else np.arange(n_samples)
+    #the first n_samples % k folds get one more data point
+    fold_sizes = np.full(k, n_samples // k)
+    fold_sizes[:n_samples % k] += 1
+    stop = 0
+    for fold_size in fold_sizes:
+        start, stop = stop, stop + fold_size
+        yield np.concatenate((permutation[:start], permutation[stop:])), permutation[start:stop]
+
+def repeated_kfold_indices(n_samples, k, repeats, seed=None):
+    """
+    Yields the repeat number, the fold number and the indices of the training and testing sets
+    of k-fold cross validation repeated with a new permutation each time.
+    """
+    assert isinstance(repeats, (int, np.integer)) and repeats > 0, "Number of repeats must be a positive integer"
+    rng = np.random.default_rng(seed)
+    for repeat in range(repeats):
+        for fold, (training, testing) in enumerate(kfold_indices(n_samples, k, rng)):
+            yield repeat, fold, training, testing
+
 #defining a function that estimates values from a confusion matrix
 def confusion_matrix(predicted, actual, positive_class):
     """
     Returns the number of true positives, false positives, 
     true negatives, and false negatives.
+    Takes lists or any 1-D array-like (numpy arrays are used without copying).
     """
-    #ensure that the input is a list
+    #convert the inputs to arrays, which doesn't copy numpy arrays
+    predicted = np.asarray(predicted)
+    actual = np.asarray(actual)
+
+    #ensure that the inputs are 1-D sequences (a string or a number is not)
     #ensure that the input lists are of the same length
     #ensure that the input lists are not empty
     #i use assertions because these are unlikely to be user errors (based on function description)
-    assert isinstance(predicted, list), "Input 'predicted' must be a list"
-    assert isinstance(actual, list), "Input 'actual' must be a list"
+    assert predicted.ndim == 1, "Input 'predicted' must be a list or 1-D array"
+    assert actual.ndim == 1, "Input 'actual' must be a list or 1-D array"
     assert len(predicted) > 0, "Input 'predicted' list is empty"
     assert len(actual) > 0, "Input 'actual' list is empty"
     assert len(predicted) == len(actual), "Input lists must be of the same length"
-    
-    #initialize TP, FP, TN, FN to 0
-    tp = 0
-    fp = 0
-    tn = 0
-    fn = 0
-
-    #iterate over the predicted and actual values
-    #increment the counter for each of the four cases
-    for pred, act in zip(predicted, actual):
-        if pred == act == positive_class:
-            tp += 1
-        elif pred == positive_class and act != positive_class:
-            fp += 1
-        elif pred != positive_class and act == positive_class:
-            fn += 1
-        else:
-            tn += 1
+
+    #count the four cases from two boolean masks instead of looping over the values
+    pred_pos = predicted == positive_class
+    act_pos = actual == positive_class
+    tp = int(np.count_nonzero(pred_pos & act_pos))
+    fp = int(np.count_nonzero(pred_pos)) - tp
+    fn = int(np.count_nonzero(act_pos)) - tp
+    tn = len(actual) - tp - fp - fn
 
     return tp, fp, tn, fn
 
+def _encode_labels(arrays, labels=None):
+    """
+    Returns the position of every value of the arrays in labels, and the labels.
+    labels defaults to the sorted classes found in the arrays.
+    Raises ValueError if a value is not one of the labels.
+    """
+    #small integer classes (the usual case) are looked up in a table instead of sorted
+    integer = all(np.issubdtype(values.dtype, np.integer) for values in arrays)
+    if integer and labels is not None:
+        integer = np.issubdtype(np.asarray(labels).dtype, np.integer)
+    if integer:
+        low = min(int(values.min()) for values in arrays)
+        high = max(int(values.max()) for values in arrays)
+        if labels is not None:
+            labels = np.asarray(labels)
+            low, high = min(low, int(labels.min())), max(high, int(labels.max()))
+        #non-negative classes index the table directly, which saves shifting every value
+        low = min(low, 0)
+        integer = high - low <= 4 * max(len(values) for values in arrays)
+
+    if integer:
+        shift = (lambda values: values - low) if low else (lambda values: values)
+        if labels is None:
+            present = np.zeros(high - low + 1, dtype=bool)
+            for values in arrays:
+                present[shift(values)] = True
+            labels = np.flatnonzero(present) + low
+        lookup = np.full(high - low + 1, -1, dtype=np.int64)
+        lookup[shift(labels)] = np.arange(len(labels))
+        codes = [lookup[shift(values)] for values in arrays]
+        if any(np.any(code < 0) for code in codes):
+            raise ValueError("All values must be one of the labels")
+        return codes, labels
+
+    if labels is None:
+        labels = np.unique(np.concatenate(arrays))
+    labels = np.asarray(labels)
+
+    #map every value to the position of its label with a binary search in the sorted labels
+    sorter = np.argsort(labels, kind='stable')
+    sorted_labels = labels[sorter]
+    codes = []
+    for values in arrays:
+        positions = np.searchsorted(sorted_labels, values).clip(0, len(labels) - 1)
+        if not np.all(sorted_labels[positions] == values):
+            raise ValueError("All values must be one of the labels")
+        codes.append(sorter[positions])
+    return codes, labels
+
+def multiclass_confusion_matrix(predicted, actual, labels=None):
+    """
+    Returns the K x K confusion matrix (rows are actual classes, columns are predicted classes)
+    and the array of the K labels.
+    labels defaults to the sorted classes found in predicted and actual.
+    Raises ValueError if a value is not one of the labels.
+    """
+    predicted = np.asarray(predicted)
+    actual = np.asarray(actual)
+    assert predicted.ndim == 1, "Input 'predicted' must be a list or 1-D array"
+    assert actual.ndim == 1, "Input 'actual' must be a list or 1-D array"
+    assert len(predicted) > 0, "Input 'predicted' list is empty"
+    assert len(predicted) == len(actual), "Input lists must be of the same length"
+
+    codes, labels = _encode_labels((actual, predicted), labels)
+    k = len(labels)
+
+    #count every (actual, predicted) pair in one pass
+    matrix = np.bincount(codes[0] * k + codes[1], minlength=k * k).reshape(k, k)
+    return matrix, labels
+
+def _ratio(numerator, denominator):
+    """
+    Returns numerator / denominator element-wise as floats, with NaN where the denominator is zero.
+    """
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominator == 0, np.nan, numerator / denominator)
+
+def multiclass_metrics(matrix, average='macro'):
+    """
+    Returns a dictionary with the accuracy, sensitivity, specificity, positive predictive value
+    and negative predictive value of a multi-class confusion matrix, treating each class in turn
+    as the positive class.
+    average='macro' takes the mean of the metrics of the classes (leaving out classes where a
+    metric is undefined), average='micro' computes the metrics from the summed TP, FP, TN and FN.
+    """
+    if average not in ('macro', 'micro'):
+        raise ValueError("average must be 'macro' or 'micro'")
+    matrix = np.asarray(matrix)
+
+    #one-vs-rest counts of every class
+    tp = np.diag(matrix)
+    fp = matrix.sum(axis=0) - tp
+    fn = matrix.sum(axis=1) - tp
+    tn = matrix.sum() - tp - fp - fn
+
+    if average == 'micro':
+        tp, fp, tn, fn = (int(i.sum()) for i in (tp, fp, tn, fn))
+        return {
+            "accuracy": accuracy(tp, fp, tn, fn),
+            "sensitivity": sensitivity(tp, fn),
+            "specificity": specificity(tn, fp),
+            "pos_pred_value": pos_pred_value(tp, fp),
+            "neg_pred_value": neg_pred_value(tn, fn),
+        }
+
+    #the mean over the classes where the metric is defined, NaN if it is defined for none
+    per_class = metrics_from_counts(tp, fp, tn, fn)
+    return {
+        name: float(values[~np.isnan(values)].mean()) if not np.all(np.isnan(values)) else float('nan')
+        for name, values in zip(METRICS, per_class.T)
+    }
+
+#names of the columns returned by metrics_from_counts and batch_metrics
+METRICS = ("accuracy", "sensitivity", "specificity", "pos_pred_value", "neg_pred_value")
+
+def metrics_from_counts(tp, fp, tn, fn):
+    """
+    Returns the accuracy, sensitivity, specificity, positive predictive value and
+    negative predictive value (in the order of METRICS) for arrays of counts,
+    as an array with one more axis of length 5. Division by zero gives NaN.
+    """
+    tp, fp, tn, fn = (np.asarray(i) for i in (tp, fp, tn, fn))
+    return np.stack([
+        _ratio(tp + tn, tp + tn + fp + fn),
+        _ratio(tp, tp + fn),
+        _ratio(tn, tn + fp),
+        _ratio(tp, tp + fp),
+        _ratio(tn, tn + fn),
+    ], axis=-1)
+
+def batch_confusion_matrix(predicted, actual, positive_class):
+    """
+    Returns the number of true positives, false positives, true negatives and false negatives
+    of many prediction vectors at once, as an array with one row (TP, FP, TN, FN) per row of
+    predicted (models x samples). actual holds the labels of the samples.
+    """
+    predicted = np.asarray(predicted)
+    actual = np.asarray(actual)
+    assert predicted.ndim == 2, "Input 'predicted' must be a 2-D array (models x samples)"
+    assert actual.ndim == 1, "Input 'actual' must be a list or 1-D array"
+    assert len(actual) > 0, "Input 'actual' list is empty"
+    assert predicted.shape[1] == len(actual), "Every row of 'predicted' must have one value per sample"
+
+    act_pos = actual == positive_class
+    tp = np.empty(len(predicted), dtype=np.int64)
+    pp = np.empty(len(predicted), dtype=np.int64)
+    #work through blocks of about a million values so the boolean masks stay in cache
+    step = max(1, 2**20 // len(actual))
+    for start in range(0, len(predicted), step):
+        pred_pos = predicted[start:start + step] == positive_class
+        pp[start:start + step] = np.count_nonzero(pred_pos, axis=1)
+        pred_pos &= act_pos
+        tp[start:start + step] = np.count_nonzero(pred_pos, axis=1)
+
+    fp = pp - tp
+    fn = np.count_nonzero(act_pos) - tp
+    tn = len(actual) - tp - fp - fn
+    return np.stack([tp, fp, tn, fn], axis=1)
+
+def batch_metrics(predicted, actual, positive_class):
+    """
+    Returns a models x 5 array with the metrics of METRICS for every row of predicted
+    (models x samples) against the labels in actual. Division by zero gives NaN,
+    like the scalar metric functions.
+    """
+    counts = batch_confusion_matrix(predicted, actual, positive_class)
+    return metrics_from_counts(*counts.T)
+
 #function 1: accuracy
 def accuracy(tp, fp, tn, fn):
     """
@@ -149,6 +397,208 @@ def neg_pred_value(tn, fn):
         return float('nan')
 
 
+def bootstrap_from_counts(tp, fp, tn, fn, n_resamples=10000, confidence=95, seed=None):
+    """
+    Returns a dictionary with the estimate and the lower and upper bounds of the percentile
+    bootstrap confidence interval (confidence between 0-100) of every metric of METRICS.
+    Resampling the data points with replacement only changes how many fall in each cell of
+    the confusion matrix, so the resampled counts are drawn from a multinomial distribution
+    instead of resampling the data. Resamples where a metric is undefined are left out.
+    """
+    assert all(isinstance(i, (int, np.integer)) and i >= 0 for i in [tp, fp, tn, fn]), "Counts must be non-negative integers"
+    assert isinstance(n_resamples, (int, np.integer)) and n_resamples > 0, "Number of resamples must be a positive integer"
+    assert 0 < confidence < 100, "Confidence must be between 0 and 100"
+    n_samples = tp + fp + tn + fn
+    assert n_samples > 0, "Counts cannot all be zero"
+
+    rng = np.random.default_rng(seed)
+    counts = rng.multinomial(n_samples, np.array([tp, fp, tn, fn]) / n_samples, size=n_resamples)
+    resampled = metrics_from_counts(*counts.T)
+    estimates = metrics_from_counts(tp, fp, tn, fn)
+
+    tail = (100 - confidence) / 2
+    intervals = {}
+    for column, name in enumerate(METRICS):
+        values = resampled[:, column]
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            intervals[name] = (float(estimates[column]), float('nan'), float('nan'))
+            continue
+        low, high = np.percentile(values, [tail, 100 - tail])
+        intervals[name] = (float(estimates[column]), float(low), float(high))
+    return intervals
+
+def bootstrap_metrics(predicted, actual, positive_class, n_resamples=10000, confidence=95, seed=None):
+    """
+    Returns a dictionary with the estimate and the lower and upper bounds of the bootstrap
+    confidence interval of every metric of METRICS, see bootstrap_from_counts.
+    """
+    tp, fp, tn, fn = confusion_matrix(predicted, actual, positive_class)
+    return bootstrap_from_counts(tp, fp, tn, fn, n_resamples, confidence, seed)
+
+
+def threshold_counts(scores, actual, positive_class):
+    """
+    Returns the distinct thresholds of the scores in decreasing order and the number of
+    true positives, false positives, true negatives and false negatives (one row per threshold)
+    when every data point with a score >= threshold is predicted positive.
+    Uses one sort and a cumulative sum instead of a confusion matrix per threshold.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    actual = np.asarray(actual)
+    assert scores.ndim == 1, "Input 'scores' must be a list or 1-D array"
+    assert actual.ndim == 1, "Input 'actual' must be a list or 1-D array"
+    assert len(scores) > 0, "Input 'scores' list is empty"
+    assert len(scores) == len(actual), "Input lists must be of the same length"
+
+    #sort by decreasing score; the last data point of each run of equal scores closes a threshold
+    order = np.argsort(-scores, kind='stable')
+    sorted_scores = scores[order]
+    act_pos = actual[order] == positive_class
+    last = np.flatnonzero(np.r_[sorted_scores[1:] != sorted_scores[:-1], True])
+
+    positives = int(np.count_nonzero(act_pos))
+    tp = np.cumsum(act_pos)[last]
+    fp = (last + 1) - tp
+    fn = positives - tp
+    tn = (len(scores) - positives) - fp
+    return sorted_scores[last], np.stack([tp, fp, tn, fn], axis=1)
+
+def roc_curve(scores, actual, positive_class):
+    """
+    Returns the false positive rates (1 - specificity), true positive rates (sensitivity)
+    and thresholds of the ROC curve, starting from the point (0, 0) at threshold infinity.
+    """
+    thresholds, counts = threshold_counts(scores, actual, positive_class)
+    tp, fp, tn, fn = counts.T
+    fpr = np.r_[0.0, 1 - _ratio(tn, tn + fp)]
+    tpr = np.r_[0.0, _ratio(tp, tp + fn)]
+    return fpr, tpr, np.r_[np.inf, thresholds]
+
+def precision_recall_curve(scores, actual, positive_class):
+    """
+    Returns the precisions (positive predictive values), recalls (sensitivities) and
+    thresholds of the precision-recall curve, one point per distinct score.
+    """
+    thresholds, counts = threshold_counts(scores, actual, positive_class)
+    tp, fp, tn, fn = counts.T
+    return _ratio(tp, tp + fp), _ratio(tp, tp + fn), thresholds
+
+def auc(x, y):
+    """
+    Returns the area under the curve through the points (x, y) with the trapezoidal rule.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    return float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+def roc_auc(scores, actual, positive_class):
+    """
+    Returns the area under the ROC curve, NaN when actual has only one class.
+    Tied scores are handled as one threshold, so it equals the probability that a random
+    positive scores higher than a random negative (ties counting one half).
+    """
+    fpr, tpr, _ = roc_curve(scores, actual, positive_class)
+    if np.isnan(fpr).any() or np.isnan(tpr).any():
+        return float('nan')
+    return auc(fpr, tpr)
+
+def average_precision(scores, actual, positive_class):
+    """
+    Returns the area under the precision-recall curve as the sum of the precisions
+    weighted by the increase in recall at each threshold. NaN without positives.
+    """
+    precision, recall, _ = precision_recall_curve(scores, actual, positive_class)
+    if np.isnan(recall).any():
+        return float('nan')
+    return float(np.sum(np.diff(np.r_[0.0, recall]) * precision))
+
+def best_threshold(scores, actual, positive_class, metric='youden'):
+    """
+    Returns the threshold that maximizes metric and the value of the metric there.
+    metric is one of METRICS, 'youden' (sensitivity + specificity - 1) or 'f1'.
+    Thresholds where the metric is undefined are skipped; ties go to the highest threshold.
+    """
+    thresholds, counts = threshold_counts(scores, actual, positive_class)
+    tp, fp, tn, fn = counts.T
+    if metric == 'youden':
+        values = _ratio(tp, tp + fn) + _ratio(tn, tn + fp) - 1
+    elif metric == 'f1':
+        values = _ratio(2 * tp, 2 * tp + fp + fn)
+    elif metric in METRICS:
+        values = metrics_from_counts(tp, fp, tn, fn)[:, METRICS.index(metric)]
+    else:
+        raise ValueError("metric must be one of METRICS, 'youden' or 'f1'")
+
+    if np.all(np.isnan(values)):
+        raise ValueError("The metric is undefined at every threshold")
+    best = int(np.nanargmax(values))
+    return float(thresholds[best]), float(values[best])
+
+
+class ConfusionAccumulator:
+    """
+    Running counts of true positives, false positives, true negatives and false negatives
+    for predictions that arrive in batches, e.g. from a stream or from several processes.
+    The state is four Python integers and the positive class, so it pickles as is, and
+    accumulators of different workers can be merged.
+    """
+    def __init__(self, positive_class):
+        self.positive_class = positive_class
+        self.tp = 0
+        self.fp = 0
+        self.tn = 0
+        self.fn = 0
+
+    def update(self, predicted, actual):
+        """
+        Adds the counts of one batch of predictions and labels. Empty batches are ignored.
+        Returns the accumulator.
+        """
+        if len(predicted) == 0 and len(actual) == 0:
+            return self
+        tp, fp, tn, fn = confusion_matrix(predicted, actual, self.positive_class)
+        self.tp += tp
+        self.fp += fp
+        self.tn += tn
+        self.fn += fn
+        return self
+
+    def merge(self, other):
+        """
+        Adds the counts of another accumulator for the same positive class.
+        Returns the accumulator.
+        """
+        if other.positive_class != self.positive_class:
+            raise ValueError("Accumulators must have the same positive class")
+        self.tp += other.tp
+        self.fp += other.fp
+        self.tn += other.tn
+        self.fn += other.fn
+        return self
+
+    def counts(self):
+        """
+        Returns the number of true positives, false positives, true negatives and false negatives.
+        """
+        return self.tp, self.fp, self.tn, self.fn
+
+    def metrics(self):
+        """
+        Returns a dictionary with the metrics of METRICS computed by the scalar functions.
+        """
+        return {
+            "accuracy": accuracy(self.tp, self.fp, self.tn, self.fn),
+            "sensitivity": sensitivity(self.tp, self.fn),
+            "specificity": specificity(self.tn, self.fp),
+            "pos_pred_value": pos_pred_value(self.tp, self.fp),
+            "neg_pred_value": neg_pred_value(self.tn, self.fn),
+        }
+
+    def __repr__(self):
+        return f"ConfusionAccumulator({self.positive_class!r}, tp={self.tp}, fp={self.fp}, tn={self.tn}, fn={self.fn})"
+
+
 def print_eval_metrics(predicted, actual, positive_class):
     """
     Prints the accuracy, sensitivity, 
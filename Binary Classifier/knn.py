@@ -0,0 +1,384 @@
+# Module with a k-nearest neighbors classifier written from scratch
+# Uses external module numpy; find_distance is the distance function of the K-means notebook
+
+import heapq
+import math
+
+import numpy as np
+
+def find_distance(x, y):
+    """Function to get the distance between 2 points on N-dimensions,
+    where x and y are the n-dimensional coordinates of two points,
+    it returns the distance"""
+    summed = 0
+    for i in range(len(x)):
+       difference = (x[i] - y[i])**2
+       summed += difference
+    rooted = math.sqrt(summed)
+    return rooted
+
+def squared_distances(queries, points):
+    """
+    Function returns the matrix of squared distances (the square of find_distance) between
+    every row of queries and every row of points. The squares of the differences are added
+    one dimension at a time, in the order of find_distance, for blocks of queries of about
+    a million distances.
+    """
+    queries = np.asarray(queries, dtype=np.float64)
+    points = np.asarray(points, dtype=np.float64)
+    result = np.empty((len(queries), len(points)))
+    step = max(1, 2**20 // max(1, len(points)))
+    for start in range(0, len(queries), step):
+        block = result[start:start + step]
+        block[:] = 0
+        for i in range(points.shape[1]):
+            difference = queries[start:start + step, i, None] - points[None, :, i]
+            difference *= difference
+            block += difference
+    return result
+
+def k_smallest(block, k):
+    """
+    Function returns the k smallest values of every row of block and their columns, from the
+    smallest, equal values coming in the order of their column.
+    """
+    # every column up to the k-th smallest value is a candidate, in the order of the columns
+    kth = np.partition(block, k - 1, axis=1)[:, k - 1]
+    rows, columns = np.nonzero(block <= kth[:, None])
+    candidates = block[rows, columns]
+    # sort the candidates by value within each row, the stable sort keeps ties in column order
+    order = np.lexsort((candidates, rows))
+    rows, columns, candidates = rows[order], columns[order], candidates[order]
+    offsets = np.searchsorted(rows, np.arange(len(block)))
+    take = (offsets[:, None] + np.arange(k)).ravel()
+    return candidates[take].reshape(-1, k), columns[take].reshape(-1, k)
+
+class KDTree:
+    """
+    KD-tree over the rows of points for exact nearest neighbor queries.
+    Every node splits its points at the median of the dimension with the largest spread,
+    until at most leaf_size points are left. The nodes are kept in flat lists and the points
+    are reordered so that every node covers one contiguous block.
+    """
+    def __init__(self, points, leaf_size=16):
+        assert leaf_size >= 1, "leaf_size must be a positive integer"
+        self.points = np.asarray(points, dtype=np.float64)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(self.points))
+        # per node: first and last position of its block, split dimension (-1 for leaves),
+        # split value and the two children
+        self.starts = []
+        self.ends = []
+        self.dims = []
+        self.splits = []
+        self.lefts = []
+        self.rights = []
+        if len(self.points):
+            self._build(0, len(self.points))
+        self.sorted_points = self.points[self.order]
+
+    def _build(self, start, end):
+        """
+        Function adds the node for the positions start to end and its children, and returns its number.
+        """
+        node = len(self.starts)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.dims.append(-1)
+        self.splits.append(0.0)
+        self.lefts.append(-1)
+        self.rights.append(-1)
+        if end - start <= self.leaf_size:
+            return node
+
+        indices = self.order[start:end]
+        block = self.points[indices]
+        spread = block.max(axis=0) - block.min(axis=0)
+        dim = int(np.argmax(spread))
+        # identical points can't be split, they stay in one leaf
+        if spread[dim] == 0:
+            return node
+
+        # points left of the median are <= the split value, points right of it are >= it
+        middle = (end - start) // 2
+        self.order[start:end] = indices[np.argpartition(block[:, dim], middle)]
+        self.dims[node] = dim
+        self.splits[node] = float(self.points[self.order[start + middle], dim])
+        self.lefts[node] = self._build(start, start + middle)
+        self.rights[node] = self._build(start + middle, end)
+        return node
+
+    def query(self, point, k):
+        """
+        Function returns the squared distances and the indices of the k points nearest to point,
+        from the nearest. Points at the same distance come in the order of their index.
+        """
+        point = np.asarray(point, dtype=np.float64)
+        # max-heap of the best k so far as (-squared distance, -index)
+        best = []
+        stack = [(0, 0.0)]
+        while stack:
+            node, bound = stack.pop()
+            # the node can't hold a point nearer than the worst of the best k
+            if len(best) == k and bound > -best[0][0]:
+                continue
+
+            dim = self.dims[node]
+            if dim < 0:
+                start, end = self.starts[node], self.ends[node]
+                # same arithmetic as the brute force search, so both find the same neighbors
+                distances = squared_distances(point[None, :], self.sorted_points[start:end])[0]
+                for distance, index in zip(distances.tolist(), self.order[start:end].tolist()):
+                    if len(best) < k:
+                        heapq.heappush(best, (-distance, -index))
+                    elif (-distance, -index) > best[0]:
+                        heapq.heapreplace(best, (-distance, -index))
+                continue
+
+            # visit the side of the split that holds the point first
+            difference = point[dim] - self.splits[node]
+            if difference <= 0:
+                near, far = self.lefts[node], self.rights[node]
+            else:
+                near, far = self.rights[node], self.lefts[node]
+            stack.append((far, difference * difference))
+            stack.append((near, bound))
+
+        best.sort(reverse=True)
+        return np.array([-distance for distance, _ in best]), np.array([-index for _, index in best], dtype=np.int64)
+
+class KNNClassifier:
+    """
+    k-nearest neighbors classifier with the fit/predict methods of scikit-learn, so that
+    its predictions go straight into class_eval.
+    algorithm is 'brute' to compare every query with every training point in vectorized
+    blocks, or 'kd_tree' to search a KDTree so that a query only visits nearby points.
+    weights is 'uniform' for a majority vote or 'distance' to weigh the neighbors by the
+    inverse of their distance (training points equal to the query then take the vote).
+    Both algorithms find the same neighbors, ties in distance going to the lower training index,
+    and a tied vote goes to the class of the nearest neighbor among the tied classes.
+    """
+    def __init__(self, n_neighbors=5, algorithm='brute', weights='uniform', leaf_size=16):
+        if algorithm not in ('brute', 'kd_tree'):
+            raise ValueError("algorithm must be 'brute' or 'kd_tree'")
+        if weights not in ('uniform', 'distance'):
+            raise ValueError("weights must be 'uniform' or 'distance'")
+        self.n_neighbors = n_neighbors
+        self.algorithm = algorithm
+        self.weights = weights
+        self.leaf_size = leaf_size
+
+    def fit(self, features, labels):
+        """
+        Function stores the training data (and builds the KD-tree) and returns the classifier.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        labels = np.asarray(labels)
+        assert features.ndim == 2, "Input 'features' must be a 2-D array (samples x features)"
+        assert len(features) == len(labels), "Every sample needs a label"
+        assert 1 <= self.n_neighbors <= len(features), "n_neighbors must be between 1 and the number of samples"
+
+        self.features = features
+        self.classes_, self.codes = np.unique(labels, return_inverse=True)
+        self.tree = KDTree(features, self.leaf_size) if self.algorithm == 'kd_tree' else None
+        return self
+
+    def kneighbors(self, features):
+        """
+        Function returns the distances and the indices of the n_neighbors training points
+        nearest to every row of features, from the nearest.
+        """
+        features = np.asarray(features, dtype=np.float64)
+        k = self.n_neighbors
+        if self.tree is not None:
+            results = [self.tree.query(point, k) for point in features]
+            distances = np.array([result[0] for result in results]).reshape(len(features), k)
+            indices = np.array([result[1] for result in results], dtype=np.int64).reshape(len(features), k)
+            return np.sqrt(distances), indices
+
+        distances = np.empty((len(features), k))
+        indices = np.empty((len(features), k), dtype=np.int64)
+        step = max(1, 2**20 // len(self.features))
+        for start in range(0, len(features), step):
+            block = squared_distances(features[start:start + step], self.features)
+            distances[start:start + step], indices[start:start + step] = k_smallest(block, k)
+        return np.sqrt(distances), indices
+
+    def _votes(self, features):
+        """
+        Function returns the votes of the neighbors for every class and the position of the
+        nearest neighbor of every class, for every row of features.
+        """
+        distances, indices = self.kneighbors(features)
+        n, k = indices.shape
+        codes = self.codes[indices]
+
+        if self.weights == 'uniform':
+            weights = np.ones((n, k))
+        else:
+            exact = distances == 0
+            with np.errstate(divide='ignore'):
+                weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(np.float64), 1.0 / distances)
+
+        rows = np.repeat(np.arange(n), k)
+        votes = np.zeros((n, len(self.classes_)))
+        np.add.at(votes, (rows, codes.ravel()), weights.ravel())
+        first = np.full((n, len(self.classes_)), k)
+        np.minimum.at(first, (rows, codes.ravel()), np.tile(np.arange(k), n))
+        return votes, first
+
+    def predict_proba(self, features):
+        """
+        Function returns the share of the votes of every class (columns in the order of classes_)
+        for every row of features, e.g. as scores for class_eval.threshold_counts.
+        """
+        votes, _ = self._votes(features)
+        return votes / votes.sum(axis=1, keepdims=True)
+
+    def predict(self, features):
+        """
+        Function returns the predicted label of every row of features.
+        """
+        votes, first = self._votes(features)
+        # among the classes with the most votes, the one with the nearest neighbor wins
+        tied = votes == votes.max(axis=1, keepdims=True)
+        return self.classes_[np.argmin(np.where(tied, first, np.iinfo(first.dtype).max), axis=1)]
+
+
+# number of set bits of every byte, for numpy versions without np.bitwise_count
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+def popcount(values):
+    """
+    Function returns the number of set bits of every value of an unsigned integer array.
+    """
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(values)
+    values = np.ascontiguousarray(values)
+    return _POPCOUNT_TABLE[values.view(np.uint8)].reshape(values.shape + (values.itemsize,)).sum(axis=-1, dtype=np.uint8)
+
+def pack_bits(bits):
+    """
+    Function packs a 2-D boolean array into one row of 64-bit words per row.
+    """
+    bits = np.asarray(bits, dtype=bool)
+    words = -(-bits.shape[1] // 64)
+    padded = np.zeros((len(bits), words * 64), dtype=bool)
+    padded[:, :bits.shape[1]] = bits
+    return np.packbits(padded, axis=1, bitorder='little').view('<u8')
+
+def pack_votes(features):
+    """
+    Function packs votes coded 1 for yes, 0 for no and 0.5 for neither (as in get_data of the notebook)
+    into two arrays of 64-bit words per row: the yes bits and the unknown bits.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    assert features.ndim == 2, "Input 'features' must be a 2-D array (samples x votes)"
+    assert np.isin(features, (0.0, 0.5, 1.0)).all(), "Votes must be 0, 0.5 or 1"
+    return pack_bits(features == 1), pack_bits(features == 0.5)
+
+def load_votes(fpath):
+    """
+    Function reads house-votes-84.data and returns the array of labels (political affiliations)
+    and the yes bits and unknown bits of the votes of every line (see pack_votes),
+    without making a Python float for every vote.
+    """
+    labels = []
+    votes = []
+    with open(fpath, 'r') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                label, _, row = line.partition(',')
+                labels.append(label)
+                votes.append(row.replace(',', ''))
+    assert len(set(len(row) for row in votes)) == 1, "Every line must have the same number of votes"
+
+    chars = np.frombuffer(''.join(votes).encode('ascii'), dtype='S1').reshape(len(votes), -1)
+    return np.array(labels), pack_bits(chars == b'y'), pack_bits(chars == b'?')
+
+def hamming_scores(query_yes, query_unknown, yes, unknown):
+    """
+    Function returns the matrix of scores between every query row and every training row of
+    packed votes: 4 for every vote known in both rows that differs, plus 1 for every vote known
+    in only one of them. That is 4 times the squared distance of find_distance on votes coded
+    1, 0 and 0.5, so the rankings of the neighbors are the same.
+    """
+    yes_words = np.ascontiguousarray(np.asarray(yes, dtype=np.uint64).T)
+    unknown_words = np.ascontiguousarray(np.asarray(unknown, dtype=np.uint64).T)
+    return _hamming_scores_by_word(query_yes, query_unknown, yes_words, unknown_words)
+
+def _hamming_scores_by_word(query_yes, query_unknown, yes_words, unknown_words):
+    """
+    Function computes hamming_scores with the training votes given as one contiguous row per word.
+    """
+    query_yes = np.asarray(query_yes, dtype=np.uint64)
+    query_unknown = np.asarray(query_unknown, dtype=np.uint64)
+    words = query_yes.shape[1]
+    assert words == len(yes_words), "Queries and training rows must have the same number of votes"
+
+    dtype = np.uint16 if 4 * 64 * words <= np.iinfo(np.uint16).max else np.int32
+    scores = np.zeros((len(query_yes), yes_words.shape[1]), dtype=dtype)
+    for w in range(words):
+        query_y = query_yes[:, w, None]
+        query_u = query_unknown[:, w, None]
+        # votes that differ where both rows are known count 4, votes known in only one row count 1
+        differ = (query_y ^ yes_words[w]) & ~(query_u | unknown_words[w])
+        scores += popcount(differ).astype(dtype) * 4
+        scores += popcount(query_u ^ unknown_words[w])
+    return scores
+
+class HammingKNNClassifier(KNNClassifier):
+    """
+    k-nearest neighbors classifier for votes coded 1, 0 and 0.5, which packs every row into
+    yes bits and unknown bits and compares them with XOR and popcount (see hamming_scores).
+    It finds the same neighbors and gives the same predictions as KNNClassifier on the same votes,
+    and takes either vote arrays (fit, predict) or packed bits (fit_packed, kneighbors_packed).
+    """
+    def __init__(self, n_neighbors=5, weights='uniform'):
+        super().__init__(n_neighbors, 'brute', weights)
+
+    def fit(self, features, labels):
+        """
+        Function packs the votes and stores them, and returns the classifier.
+        """
+        yes, unknown = pack_votes(features)
+        return self.fit_packed(yes, unknown, labels)
+
+    def fit_packed(self, yes, unknown, labels):
+        """
+        Function stores packed votes (e.g. from load_votes) and returns the classifier.
+        """
+        labels = np.asarray(labels)
+        assert len(yes) == len(unknown) == len(labels), "Every sample needs a label"
+        assert 1 <= self.n_neighbors <= len(labels), "n_neighbors must be between 1 and the number of samples"
+        # one contiguous row of every word for the whole training set
+        self.yes_words = np.ascontiguousarray(np.asarray(yes, dtype=np.uint64).T)
+        self.unknown_words = np.ascontiguousarray(np.asarray(unknown, dtype=np.uint64).T)
+        self.classes_, self.codes = np.unique(labels, return_inverse=True)
+        self.tree = None
+        return self
+
+    def kneighbors(self, features):
+        """
+        Function returns the (Euclidean) distances and the indices of the n_neighbors training
+        rows nearest to every row of votes, from the nearest.
+        """
+        return self.kneighbors_packed(*pack_votes(features))
+
+    def kneighbors_packed(self, yes, unknown):
+        """
+        Function returns the distances and the indices of the n_neighbors training rows nearest
+        to every row of packed votes, working through blocks of about a million scores.
+        """
+        yes = np.asarray(yes, dtype=np.uint64)
+        unknown = np.asarray(unknown, dtype=np.uint64)
+        k = self.n_neighbors
+        distances = np.empty((len(yes), k))
+        indices = np.empty((len(yes), k), dtype=np.int64)
+        step = max(1, 2**20 // self.yes_words.shape[1])
+        for start in range(0, len(yes), step):
+            scores = _hamming_scores_by_word(yes[start:start + step], unknown[start:start + step], self.yes_words, self.unknown_words)
+            distances[start:start + step], indices[start:start + step] = k_smallest(scores, k)
+        # the scores are 4 times the squared distances
+        return np.sqrt(distances) / 2, indices
@@ -0,0 +1,117 @@
+# Module to choose the number of neighbors k of a KNN classifier by repeated cross validation
+# Uses external module numpy, class_eval for the splits and metrics, and multiprocessing for the jobs
+
+import multiprocessing
+
+import numpy as np
+
+import class_eval
+import knn
+
+def knn_factory(k):
+    """
+    Returns the KNNClassifier of the knn module with k neighbors.
+    """
+    return knn.KNNClassifier(n_neighbors=k)
+
+def sklearn_knn_factory(k):
+    """
+    Returns a scikit-learn KNeighborsClassifier with k neighbors.
+    scikit-learn is only imported when a model is made, so the module works without it.
+    """
+    from sklearn.neighbors import KNeighborsClassifier
+    return KNeighborsClassifier(n_neighbors=k)
+
+# State of the worker processes of cross_validate_k, set once per process
+_worker_state = {}
+
+def _init_worker(features, labels, positive_class, model_factory):
+    """
+    Function stores the dataset in a worker process once, so that jobs only carry indices.
+    """
+    _worker_state["features"] = features
+    _worker_state["labels"] = labels
+    _worker_state["positive_class"] = positive_class
+    _worker_state["model_factory"] = model_factory
+
+def _run_job(job):
+    """
+    Function fits a model with k neighbors on the training indices of one fold and
+    returns a dictionary with the counts and metrics of its predictions on the testing indices.
+    """
+    repeat, fold, k, training, testing = job
+    features = _worker_state["features"]
+    labels = _worker_state["labels"]
+    positive_class = _worker_state["positive_class"]
+
+    model = _worker_state["model_factory"](k)
+    model.fit(features[training], labels[training])
+    predicted = model.predict(features[testing])
+
+    tp, fp, tn, fn = class_eval.confusion_matrix(predicted, labels[testing], positive_class)
+    result = {"repeat": repeat, "fold": fold, "k": k, "tp": tp, "fp": fp, "tn": tn, "fn": fn}
+    for name, value in zip(class_eval.METRICS, class_eval.metrics_from_counts(tp, fp, tn, fn)):
+        result[name] = float(value)
+    return result
+
+def summarize_by_k(results, metric='accuracy'):
+    """
+    Function returns a dictionary k -> (mean, standard deviation) of metric over the folds
+    of the results of cross_validate_k, leaving out folds where the metric is undefined.
+    """
+    values = {}
+    for result in results:
+        values.setdefault(result["k"], []).append(result[metric])
+
+    summary = {}
+    for k in sorted(values):
+        defined = np.array(values[k])
+        defined = defined[~np.isnan(defined)]
+        summary[k] = (float(defined.mean()), float(defined.std())) if len(defined) else (float('nan'), float('nan'))
+    return summary
+
+def cross_validate_k(features, labels, ks, positive_class, n_folds=5, repeats=1, seed=None,
+                     processes=None, model_factory=knn_factory, metric='accuracy'):
+    """
+    Function runs repeated k-fold cross validation of a model for every k in ks and returns
+    a list with one dictionary per (repeat, fold, k) holding the TP, FP, TN and FN of the fold
+    and the metrics of class_eval.METRICS, and the k with the best mean metric (the smallest k on ties).
+    Every k is scored on the same folds. model_factory(k) must return an object with fit and predict,
+    and be picklable (a function defined at module level) when processes is not 1.
+    The jobs run in a pool of processes (os.cpu_count() by default); the dataset is handed to
+    each worker once when the pool starts. processes=1 runs the jobs in this process.
+    """
+    features = np.asarray(features, dtype=np.float64)
+    labels = np.asarray(labels)
+    ks = list(ks)
+    assert features.ndim == 2, "Input 'features' must be a 2-D array (samples x features)"
+    assert len(features) == len(labels), "Every sample needs a label"
+    assert len(ks) > 0, "Input 'ks' cannot be empty"
+    if metric not in class_eval.METRICS:
+        raise ValueError("metric must be one of class_eval.METRICS")
+
+    jobs = [
+        (repeat, fold, k, training, testing)
+        for repeat, fold, training, testing in class_eval.repeated_kfold_indices(len(labels), n_folds, repeats, seed)
+        for k in ks
+    ]
+
+    if processes == 1:
+        _init_worker(features, labels, positive_class, model_factory)
+        try:
+            results = [_run_job(job) for job in jobs]
+        finally:
+            _worker_state.clear()
+    else:
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        chunksize = max(1, len(jobs) // (4 * processes))
+        with multiprocessing.Pool(processes, initializer=_init_worker,
+                                  initargs=(features, labels, positive_class, model_factory)) as pool:
+            results = list(pool.imap_unordered(_run_job, jobs, chunksize=chunksize))
+        results.sort(key=lambda result: (result["repeat"], result["fold"], ks.index(result["k"])))
+
+    summary = summarize_by_k(results, metric)
+    defined = [k for k in summary if not np.isnan(summary[k][0])]
+    best_k = max(defined, key=lambda k: (summary[k][0], -k)) if defined else None
+    return results, best_k
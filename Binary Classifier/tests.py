@@ -1,7 +1,13 @@
 import unittest
 import math
+import os
+import pickle
+import tempfile
 import unittest
+import numpy as np
 import class_eval
+import knn
+import model_selection
 
 #separate class for each function
 #i don't test the print function, because it relies on the other functions, and is a simple print command
@@ -143,6 +149,24 @@ class TestConfusionMatrix(unittest.TestCase):
         with self.assertRaises(AssertionError, msg="Input 'actual' must be a list"):
             class_eval.confusion_matrix([1, 1, 1], 'b', 1)
 
+    def test_confusion_matrix_numpy_input(self):
+        """
+        Test that numpy arrays give the same counts as lists, as Python integers.
+        """
+        predicted = ['democrat', 'republican', 'democrat', 'democrat', 'republican']
+        actual = ['democrat', 'democrat', 'republican', 'democrat', 'republican']
+        output = class_eval.confusion_matrix(np.array(predicted), np.array(actual), 'democrat')
+        self.assertEqual(output, class_eval.confusion_matrix(predicted, actual, 'democrat'))
+        self.assertEqual(output, (2, 1, 1, 1))
+        self.assertTrue(all(type(i) is int for i in output))
+
+    def test_confusion_matrix_2d_input(self):
+        """
+        Test that an AssertionError is raised for 2-D input.
+        """
+        with self.assertRaises(AssertionError):
+            class_eval.confusion_matrix(np.ones((2, 2)), np.ones((2, 2)), 1)
+
 
 
 class TestAccuracy(unittest.TestCase):
@@ -593,6 +617,526 @@ class TestNeg_pred_value(unittest.TestCase):
         """
         with self.assertRaises(ValueError, msg="All inputs must be non-negative integers."):
             class_eval.neg_pred_value(-1, 1)
+
+
+class TestMulticlassConfusionMatrix(unittest.TestCase):
+
+    def test_multiclass_confusion_matrix(self):
+        """
+        Test a small three class example, rows are actual classes and columns predicted classes.
+        """
+        predicted = ['a', 'b', 'c', 'a', 'c', 'c']
+        actual = ['a', 'b', 'b', 'c', 'c', 'a']
+        matrix, labels = class_eval.multiclass_confusion_matrix(predicted, actual)
+        self.assertEqual(list(labels), ['a', 'b', 'c'])
+        self.assertEqual(matrix.tolist(), [[1, 0, 1], [0, 1, 1], [1, 0, 1]])
+
+    def test_multiclass_confusion_matrix_labels(self):
+        """
+        Test that given labels fix the order of the rows and columns and may be absent from the data.
+        """
+        matrix, labels = class_eval.multiclass_confusion_matrix([5, 7, 7], [7, 7, 5], labels=[7, 5, 9])
+        self.assertEqual(matrix.tolist(), [[1, 1, 0], [1, 0, 0], [0, 0, 0]])
+
+    def test_multiclass_confusion_matrix_unknown_label(self):
+        """
+        Test that a ValueError is raised for a value that is not one of the labels.
+        """
+        with self.assertRaises(ValueError):
+            class_eval.multiclass_confusion_matrix([5, 8], [5, 5], labels=[5, 7])
+        with self.assertRaises(ValueError):
+            class_eval.multiclass_confusion_matrix(['y', 'q'], ['y', 'y'], labels=['y', 'n'])
+
+    def test_multiclass_matches_binary(self):
+        """
+        Test that the two class matrix holds the counts of confusion_matrix.
+        """
+        predicted = [1, 0, 1, 1, 0, 0, 1]
+        actual = [1, 1, 0, 1, 0, 0, 0]
+        matrix, labels = class_eval.multiclass_confusion_matrix(predicted, actual, labels=[1, 0])
+        tp, fp, tn, fn = class_eval.confusion_matrix(predicted, actual, 1)
+        self.assertEqual(matrix.tolist(), [[tp, fn], [fp, tn]])
+
+
+class TestMulticlassMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = np.array([[1, 0, 1], [0, 1, 1], [1, 0, 1]])
+
+    def test_micro_metrics(self):
+        """
+        Test that micro averages are the metrics of the summed one-vs-rest counts.
+        """
+        output = class_eval.multiclass_metrics(self.matrix, average='micro')
+        # summed over the classes TP = 3, FP = 3, TN = 9, FN = 3
+        self.assertAlmostEqual(output['accuracy'], 12 / 18)
+        self.assertAlmostEqual(output['sensitivity'], 0.5)
+        self.assertAlmostEqual(output['specificity'], 0.75)
+        self.assertAlmostEqual(output['pos_pred_value'], 0.5)
+        self.assertAlmostEqual(output['neg_pred_value'], 0.75)
+
+    def test_macro_metrics(self):
+        """
+        Test that macro averages are the means of the metrics of the classes.
+        """
+        output = class_eval.multiclass_metrics(self.matrix, average='macro')
+        self.assertAlmostEqual(output['sensitivity'], (1 / 2 + 1 / 2 + 1 / 2) / 3)
+        self.assertAlmostEqual(output['pos_pred_value'], (1 / 2 + 1 / 1 + 1 / 3) / 3)
+
+    def test_macro_metrics_undefined_class(self):
+        """
+        Test that a class that never occurs is left out of the macro sensitivity.
+        """
+        output = class_eval.multiclass_metrics(np.array([[2, 0], [0, 0]]), average='macro')
+        self.assertAlmostEqual(output['sensitivity'], 1.0)
+        self.assertTrue(math.isnan(class_eval.multiclass_metrics(np.zeros((2, 2), dtype=int))['sensitivity']))
+
+    def test_unknown_average(self):
+        """
+        Test that a ValueError is raised for an unknown average.
+        """
+        with self.assertRaises(ValueError):
+            class_eval.multiclass_metrics(self.matrix, average='weighted')
+
+
+class TestBatchMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.actual = [1, 1, 0, 0, 1, 0]
+        self.predicted = np.array([
+            [1, 1, 0, 0, 1, 0],
+            [1, 0, 1, 0, 1, 0],
+            [0, 0, 0, 0, 0, 0],
+        ])
+
+    def test_batch_confusion_matrix(self):
+        """
+        Test that every row has the counts of confusion_matrix for that prediction vector.
+        """
+        counts = class_eval.batch_confusion_matrix(self.predicted, self.actual, 1)
+        for row, predicted in zip(counts, self.predicted):
+            self.assertEqual(tuple(row), class_eval.confusion_matrix(predicted, self.actual, 1))
+
+    def test_batch_metrics(self):
+        """
+        Test that every row has the metrics of the scalar functions, with NaN on division by zero.
+        """
+        output = class_eval.batch_metrics(self.predicted, self.actual, 1)
+        self.assertEqual(output.shape, (3, len(class_eval.METRICS)))
+        tp, fp, tn, fn = class_eval.confusion_matrix(self.predicted[1], self.actual, 1)
+        expected = [
+            class_eval.accuracy(tp, fp, tn, fn), class_eval.sensitivity(tp, fn), class_eval.specificity(tn, fp),
+            class_eval.pos_pred_value(tp, fp), class_eval.neg_pred_value(tn, fn),
+        ]
+        np.testing.assert_allclose(output[1], expected)
+        np.testing.assert_allclose(output[0], [1, 1, 1, 1, 1])
+        #the last model predicts no positives, so its positive predictive value is undefined
+        self.assertTrue(math.isnan(output[2, class_eval.METRICS.index('pos_pred_value')]))
+
+    def test_batch_metrics_wrong_shape(self):
+        """
+        Test that an AssertionError is raised for 1-D predictions or a different number of samples.
+        """
+        with self.assertRaises(AssertionError):
+            class_eval.batch_metrics(self.predicted[0], self.actual, 1)
+        with self.assertRaises(AssertionError):
+            class_eval.batch_metrics(self.predicted[:, :5], self.actual, 1)
+
+
+class TestConfusionAccumulator(unittest.TestCase):
+
+    def setUp(self):
+        self.predicted = ['d', 'r', 'd', 'd', 'r', 'r', 'd', 'r']
+        self.actual = ['d', 'd', 'r', 'd', 'r', 'r', 'd', 'd']
+
+    def test_batches_match_confusion_matrix(self):
+        """
+        Test that updating in batches gives the counts and metrics of the whole lists.
+        """
+        accumulator = class_eval.ConfusionAccumulator('d')
+        for start in range(0, 8, 3):
+            accumulator.update(self.predicted[start:start + 3], np.array(self.actual[start:start + 3]))
+        accumulator.update([], [])
+        tp, fp, tn, fn = class_eval.confusion_matrix(self.predicted, self.actual, 'd')
+        self.assertEqual(accumulator.counts(), (tp, fp, tn, fn))
+        self.assertEqual(accumulator.metrics()['sensitivity'], class_eval.sensitivity(tp, fn))
+        self.assertEqual(accumulator.metrics()['accuracy'], class_eval.accuracy(tp, fp, tn, fn))
+
+    def test_merge_pickled_accumulators(self):
+        """
+        Test that accumulators sent through pickle (as between processes) merge into the full counts.
+        """
+        first = class_eval.ConfusionAccumulator('d').update(self.predicted[:4], self.actual[:4])
+        second = class_eval.ConfusionAccumulator('d').update(self.predicted[4:], self.actual[4:])
+        merged = pickle.loads(pickle.dumps(first)).merge(pickle.loads(pickle.dumps(second)))
+        self.assertEqual(merged.counts(), class_eval.confusion_matrix(self.predicted, self.actual, 'd'))
+
+    def test_merge_different_positive_class(self):
+        """
+        Test that a ValueError is raised when merging accumulators of different positive classes.
+        """
+        with self.assertRaises(ValueError):
+            class_eval.ConfusionAccumulator('d').merge(class_eval.ConfusionAccumulator('r'))
+
+    def test_no_predictions(self):
+        """
+        Test that an empty accumulator gives NaN metrics.
+        """
+        self.assertTrue(math.isnan(class_eval.ConfusionAccumulator(1).metrics()['accuracy']))
+
+
+class TestIndexSplitters(unittest.TestCase):
+
+    def test_holdout_indices(self):
+        """
+        Test that the holdout indices cover every data point once, with the test size of split_training_testing.
+        """
+        training, testing = class_eval.holdout_indices(50, 20, seed=0)
+        self.assertEqual(len(testing), 10)
+        self.assertEqual(sorted(np.concatenate((training, testing)).tolist()), list(range(50)))
+
+    def test_holdout_indices_seed(self):
+        """
+        Test that the same seed gives the same split and that a Generator can be passed.
+        """
+        first = class_eval.holdout_indices(30, 50, seed=3)
+        second = class_eval.holdout_indices(30, 50, seed=3)
+        np.testing.assert_array_equal(first[1], second[1])
+        third = class_eval.holdout_indices(30, 50, seed=np.random.default_rng(3))
+        np.testing.assert_array_equal(first[1], third[1])
+
+    def test_holdout_indices_out_of_range(self):
+        """
+        Test that an AssertionError is raised for a percentage outside 0-100.
+        """
+        with self.assertRaises(AssertionError):
+            class_eval.holdout_indices(10, 101)
+
+    def test_stratified_holdout_indices(self):
+        """
+        Test that every class keeps its share in the testing set.
+        """
+        labels = ['democrat'] * 60 + ['republican'] * 40
+        training, testing = class_eval.stratified_holdout_indices(labels, 25, seed=0)
+        self.assertEqual(len(testing), 25)
+        tested = [labels[i] for i in testing]
+        self.assertEqual(tested.count('democrat'), 15)
+        self.assertEqual(tested.count('republican'), 10)
+        self.assertEqual(sorted(np.concatenate((training, testing)).tolist()), list(range(100)))
+
+    def test_kfold_indices(self):
+        """
+        Test that the folds are tested once each, have sizes differing by at most one and don't overlap the training set.
+        """
+        folds = list(class_eval.kfold_indices(11, 3, seed=0))
+        self.assertEqual([len(testing) for _, testing in folds], [4, 4, 3])
+        self.assertEqual(sorted(np.concatenate([testing for _, testing in folds]).tolist()), list(range(11)))
+        for training, testing in folds:
+            self.assertEqual(len(set(training.tolist()) & set(testing.tolist())), 0)
+            self.assertEqual(len(training) + len(testing), 11)
+
+    def test_repeated_kfold_indices(self):
+        """
+        Test that every repeat is a full k-fold split with its own permutation.
+        """
+        splits = list(class_eval.repeated_kfold_indices(12, 4, 3, seed=0))
+        self.assertEqual([(repeat, fold) for repeat, fold, _, _ in splits], [(r, f) for r in range(3) for f in range(4)])
+        self.assertFalse(np.array_equal(splits[0][3], splits[4][3]))
+
+
+class TestThresholdSweep(unittest.TestCase):
+
+    def setUp(self):
+        self.scores = [0.9, 0.8, 0.8, 0.6, 0.3, 0.1]
+        self.actual = [1, 1, 0, 1, 0, 0]
+
+    def test_threshold_counts(self):
+        """
+        Test that the counts at every distinct threshold are those of confusion_matrix on the thresholded scores.
+        """
+        thresholds, counts = class_eval.threshold_counts(self.scores, self.actual, 1)
+        self.assertEqual(thresholds.tolist(), [0.9, 0.8, 0.6, 0.3, 0.1])
+        for threshold, row in zip(thresholds, counts):
+            predicted = [1 if score >= threshold else 0 for score in self.scores]
+            self.assertEqual(tuple(row), class_eval.confusion_matrix(predicted, self.actual, 1))
+
+    def test_roc_curve_and_auc(self):
+        """
+        Test the ROC curve and that its area counts tied scores as one half.
+        """
+        fpr, tpr, thresholds = class_eval.roc_curve(self.scores, self.actual, 1)
+        np.testing.assert_allclose(fpr, [0, 0, 1 / 3, 1 / 3, 2 / 3, 1])
+        np.testing.assert_allclose(tpr, [0, 1 / 3, 2 / 3, 1, 1, 1])
+        #7 of the 9 positive-negative pairs are ordered correctly, one is tied and one is reversed
+        self.assertAlmostEqual(class_eval.roc_auc(self.scores, self.actual, 1), 7.5 / 9)
+
+    def test_roc_auc_one_class(self):
+        """
+        Test that the ROC AUC is NaN when there are no negatives.
+        """
+        self.assertTrue(math.isnan(class_eval.roc_auc([0.2, 0.4], [1, 1], 1)))
+
+    def test_precision_recall(self):
+        """
+        Test the precision-recall curve and the average precision.
+        """
+        precision, recall, _ = class_eval.precision_recall_curve(self.scores, self.actual, 1)
+        np.testing.assert_allclose(precision, [1, 2 / 3, 3 / 4, 3 / 5, 1 / 2])
+        np.testing.assert_allclose(recall, [1 / 3, 2 / 3, 1, 1, 1])
+        self.assertAlmostEqual(class_eval.average_precision(self.scores, self.actual, 1), (1 + 2 / 3 + 3 / 4) / 3)
+
+    def test_best_threshold(self):
+        """
+        Test that the best threshold maximizes the chosen metric.
+        """
+        threshold, value = class_eval.best_threshold(self.scores, self.actual, 1)
+        self.assertEqual(threshold, 0.6)
+        self.assertAlmostEqual(value, 2 / 3)
+        threshold, value = class_eval.best_threshold(self.scores, self.actual, 1, metric='accuracy')
+        self.assertEqual(threshold, 0.6)
+        self.assertAlmostEqual(value, 5 / 6)
+        with self.assertRaises(ValueError):
+            class_eval.best_threshold(self.scores, self.actual, 1, metric='kappa')
+
+
+class TestBootstrap(unittest.TestCase):
+
+    def test_bootstrap_contains_estimate(self):
+        """
+        Test that every interval contains the estimate of the scalar metric functions.
+        """
+        predicted = [1, 0, 1, 1, 0, 0, 1, 0, 1, 1] * 10
+        actual = [1, 0, 0, 1, 0, 1, 1, 0, 1, 0] * 10
+        intervals = class_eval.bootstrap_metrics(predicted, actual, 1, n_resamples=2000, seed=0)
+        tp, fp, tn, fn = class_eval.confusion_matrix(predicted, actual, 1)
+        self.assertEqual(intervals['accuracy'][0], class_eval.accuracy(tp, fp, tn, fn))
+        for name in class_eval.METRICS:
+            estimate, low, high = intervals[name]
+            self.assertLessEqual(low, estimate)
+            self.assertLessEqual(estimate, high)
+
+    def test_bootstrap_seed(self):
+        """
+        Test that the same seed gives the same intervals and a lower confidence gives a narrower interval.
+        """
+        first = class_eval.bootstrap_from_counts(40, 10, 35, 15, n_resamples=500, seed=1)
+        second = class_eval.bootstrap_from_counts(40, 10, 35, 15, n_resamples=500, seed=1)
+        self.assertEqual(first, second)
+        narrow = class_eval.bootstrap_from_counts(40, 10, 35, 15, n_resamples=500, confidence=50, seed=1)
+        self.assertLess(narrow['accuracy'][2] - narrow['accuracy'][1], first['accuracy'][2] - first['accuracy'][1])
+
+    def test_bootstrap_undefined_metric(self):
+        """
+        Test that a metric that is undefined in every resample has a NaN interval.
+        """
+        intervals = class_eval.bootstrap_from_counts(3, 0, 0, 0, n_resamples=100, seed=0)
+        self.assertTrue(math.isnan(intervals['specificity'][1]))
+        self.assertEqual(intervals['accuracy'], (1.0, 1.0, 1.0))
+
+    def test_bootstrap_bad_confidence(self):
+        """
+        Test that an AssertionError is raised for a confidence outside 0-100.
+        """
+        with self.assertRaises(AssertionError):
+            class_eval.bootstrap_from_counts(1, 1, 1, 1, confidence=100)
+
+
+class NearestMeansModel:
+    """
+    Small model for the cross validation tests: predicts the class of the k-th nearest
+    class mean, so that its accuracy depends on k.
+    """
+    def __init__(self, k):
+        self.k = k
+
+    def fit(self, features, labels):
+        self.classes = np.unique(labels)
+        self.means = np.array([features[labels == c].mean(axis=0) for c in self.classes])
+        return self
+
+    def predict(self, features):
+        distances = ((features[:, None, :] - self.means[None, :, :]) ** 2).sum(axis=2)
+        order = np.argsort(distances, axis=1)
+        return self.classes[order[:, min(self.k, len(self.classes)) - 1]]
+
+
+class TestCrossValidateK(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.labels = np.array(['democrat'] * 30 + ['republican'] * 30)
+        self.features = np.r_[rng.normal(0, 1, (30, 4)), rng.normal(3, 1, (30, 4))]
+
+    def test_results_table_and_best_k(self):
+        """
+        Test that there is one result per repeat, fold and k, and that the k with the best mean accuracy is chosen.
+        """
+        results, best_k = model_selection.cross_validate_k(
+            self.features, self.labels, [1, 2], 'democrat', n_folds=3, repeats=2, seed=0,
+            processes=1, model_factory=NearestMeansModel,
+        )
+        self.assertEqual(len(results), 2 * 3 * 2)
+        self.assertEqual(best_k, 1)
+        summary = model_selection.summarize_by_k(results)
+        self.assertGreater(summary[1][0], summary[2][0])
+        for result in results:
+            counts = (result['tp'], result['fp'], result['tn'], result['fn'])
+            self.assertEqual(sum(counts), 20)
+            self.assertEqual(result['accuracy'], class_eval.accuracy(*counts))
+
+    def test_pool_matches_serial(self):
+        """
+        Test that the process pool gives the same table as running the jobs in this process.
+        """
+        options = dict(n_folds=4, repeats=1, seed=1, model_factory=NearestMeansModel)
+        serial = model_selection.cross_validate_k(self.features, self.labels, [2, 1], 'democrat', processes=1, **options)
+        pooled = model_selection.cross_validate_k(self.features, self.labels, [2, 1], 'democrat', processes=2, **options)
+        self.assertEqual(serial, pooled)
+
+
+class TestKNN(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        #votes are 0, 0.5 or 1 like in house-votes-84.data, so many distances are tied
+        self.features = rng.integers(0, 3, (120, 6)) / 2
+        self.labels = np.where(self.features[:, :3].sum(axis=1) > 1.5, 'democrat', 'republican')
+
+    def test_find_distance(self):
+        """
+        Test find_distance and that squared_distances holds its squares.
+        """
+        self.assertEqual(knn.find_distance([0, 3, 0], [4, 0, 0]), 5)
+        distances = knn.squared_distances(self.features[:3], self.features[:5])
+        for i in range(3):
+            for j in range(5):
+                self.assertAlmostEqual(distances[i, j], knn.find_distance(self.features[i], self.features[j]) ** 2)
+
+    def test_brute_and_kd_tree_agree(self):
+        """
+        Test that both algorithms find the same neighbors, with tied distances in the order of the training index.
+        """
+        training, queries = self.features[:100], self.features[100:]
+        expected = np.argsort(knn.squared_distances(queries, training), axis=1, kind='stable')[:, :7]
+        for algorithm in ('brute', 'kd_tree'):
+            model = knn.KNNClassifier(n_neighbors=7, algorithm=algorithm, leaf_size=4).fit(training, self.labels[:100])
+            distances, indices = model.kneighbors(queries)
+            np.testing.assert_array_equal(indices, expected)
+            self.assertTrue(np.all(np.diff(distances, axis=1) >= 0))
+
+    def test_predict_with_class_eval(self):
+        """
+        Test that the predictions of both algorithms and both votes are the same and can be scored by class_eval.
+        """
+        training, queries = self.features[:100], self.features[100:]
+        predictions = []
+        for algorithm in ('brute', 'kd_tree'):
+            for weights in ('uniform', 'distance'):
+                model = knn.KNNClassifier(5, algorithm=algorithm, weights=weights).fit(training, self.labels[:100])
+                predictions.append(model.predict(queries))
+        np.testing.assert_array_equal(predictions[0], predictions[2])
+        np.testing.assert_array_equal(predictions[1], predictions[3])
+        tp, fp, tn, fn = class_eval.confusion_matrix(predictions[0], self.labels[100:], 'democrat')
+        self.assertEqual(tp + fp + tn + fn, 20)
+
+    def test_votes(self):
+        """
+        Test majority and distance-weighted votes on a line: two far neighbors outvote one near
+        neighbor by majority, but not when weighted, and an exact match takes the whole weighted vote.
+        """
+        features = [[0.0], [3.0], [3.5]]
+        labels = ['a', 'b', 'b']
+        majority = knn.KNNClassifier(3).fit(features, labels)
+        weighted = knn.KNNClassifier(3, weights='distance').fit(features, labels)
+        self.assertEqual(majority.predict([[1.0]]).tolist(), ['b'])
+        self.assertEqual(weighted.predict([[1.0]]).tolist(), ['a'])
+        self.assertEqual(weighted.predict([[3.5]]).tolist(), ['b'])
+        np.testing.assert_allclose(majority.predict_proba([[1.0]]), [[1 / 3, 2 / 3]])
+
+    def test_tied_vote(self):
+        """
+        Test that a tied vote goes to the class of the nearest neighbor.
+        """
+        model = knn.KNNClassifier(2).fit([[0.0], [2.0]], ['b', 'a'])
+        self.assertEqual(model.predict([[0.5], [1.5]]).tolist(), ['b', 'a'])
+
+    def test_bad_options(self):
+        """
+        Test that a ValueError is raised for an unknown algorithm or vote.
+        """
+        with self.assertRaises(ValueError):
+            knn.KNNClassifier(algorithm='ball_tree')
+        with self.assertRaises(ValueError):
+            knn.KNNClassifier(weights='rank')
+
+    def test_default_model_of_cross_validation(self):
+        """
+        Test that cross_validate_k runs with its default model, the KNNClassifier.
+        """
+        results, best_k = model_selection.cross_validate_k(self.features, self.labels, [1, 3], 'democrat', n_folds=3, seed=0, processes=1)
+        self.assertEqual(len(results), 6)
+        self.assertIn(best_k, [1, 3])
+
+
+class TestHammingKNN(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.features = rng.integers(0, 3, (80, 16)) / 2
+        self.labels = np.where(self.features[:, :4].sum(axis=1) > 2, 'democrat', 'republican')
+
+    def test_load_votes(self):
+        """
+        Test that load_votes gives the packed bits of the 1, 0, 0.5 coding of the notebook.
+        """
+        handle, file_path = tempfile.mkstemp(suffix=".data")
+        with os.fdopen(handle, 'w') as file:
+            file.write("republican,n,y,?\ndemocrat,y,?,y\n")
+        labels, yes, unknown = knn.load_votes(file_path)
+        os.remove(file_path)
+        self.assertEqual(labels.tolist(), ['republican', 'democrat'])
+        expected_yes, expected_unknown = knn.pack_votes([[0, 1, 0.5], [1, 0.5, 1]])
+        np.testing.assert_array_equal(yes, expected_yes)
+        np.testing.assert_array_equal(unknown, expected_unknown)
+        self.assertEqual(yes[:, 0].tolist(), [0b010, 0b101])
+
+    def test_scores_are_four_times_squared_distances(self):
+        """
+        Test that the scores are 4 times the squared Euclidean distances, also for more than 64 votes.
+        """
+        for features in (self.features, np.random.default_rng(2).integers(0, 3, (10, 70)) / 2):
+            yes, unknown = knn.pack_votes(features)
+            scores = knn.hamming_scores(yes, unknown, yes, unknown)
+            np.testing.assert_array_equal(scores, 4 * knn.squared_distances(features, features))
+
+    def test_popcount(self):
+        """
+        Test popcount on a few 64-bit words.
+        """
+        values = np.array([0, 1, 0b1011, 2**64 - 1], dtype=np.uint64)
+        self.assertEqual(knn.popcount(values).tolist(), [0, 1, 3, 64])
+
+    def test_same_neighbors_as_knn(self):
+        """
+        Test that the Hamming engine finds the neighbors and predictions of KNNClassifier.
+        """
+        training, queries = self.features[:60], self.features[60:]
+        for weights in ('uniform', 'distance'):
+            euclidean = knn.KNNClassifier(7, weights=weights).fit(training, self.labels[:60])
+            hamming = knn.HammingKNNClassifier(7, weights=weights).fit(training, self.labels[:60])
+            distances, indices = hamming.kneighbors(queries)
+            expected_distances, expected_indices = euclidean.kneighbors(queries)
+            np.testing.assert_array_equal(indices, expected_indices)
+            np.testing.assert_allclose(distances, expected_distances)
+            np.testing.assert_array_equal(hamming.predict(queries), euclidean.predict(queries))
+
+    def test_pack_votes_bad_value(self):
+        """
+        Test that an AssertionError is raised for a vote that is not 0, 0.5 or 1.
+        """
+        with self.assertRaises(AssertionError):
+            knn.pack_votes([[0, 0.3]])
+
         
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,224 @@
+# Module to benchmark the reverts_network pipeline on synthetic edit logs
+# Uses external module numpy for the generator, and time/tracemalloc for the measurements
+# Run it as a script, e.g. python benchmark_reverts.py --sizes 10000 100000 --output results.jsonl
+
+import argparse
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+import reverts_network as rn
+
+# Stages of the pipeline in the order they run; create_revert_network_parallel builds the same
+# network as create_revert_network with a pool of processes, so the two rows can be compared
+STAGES = ["read_data", "create_user_info", "create_revert_network", "create_revert_network_parallel",
+          "count_and_label_AB_BA", "get_seniority_diffs"]
+
+def generate_edit_log(file_path, n_edits, n_users=1000, n_articles=None, revert_rate=0.1, burstiness=0.3,
+                      seed=0, start=datetime(2006, 1, 1)):
+    """
+    Function writes a synthetic edit log in the layout of rowiki_2006.txt: a header line, then
+    one line per edit (title, timestamp, revert, version, user), grouped by article and in
+    reverse chronological order within each article.
+    Users and articles follow power-law activity. An edit is a revert of the previous edit
+    with probability revert_rate, and with probability burstiness a revert starts an edit war
+    in which the two users keep reverting each other within minutes.
+    n_articles defaults to one article per 50 edits.
+    """
+    rng = np.random.default_rng(seed)
+    if n_articles is None:
+        n_articles = max(1, n_edits // 50)
+
+    # power-law weights for the activity of users and the size of articles
+    user_weights = 1.0 / np.arange(1, n_users + 1) ** 1.1
+    user_weights /= user_weights.sum()
+    article_weights = 1.0 / np.arange(1, n_articles + 1) ** 0.8
+    article_weights /= article_weights.sum()
+    article_sizes = rng.multinomial(n_edits, article_weights)
+
+    start_seconds = int(np.datetime64(start, 's').astype(np.int64))
+    next_version = 1
+
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write("title\ttime\trevert\tversion\tuser\n")
+        for article, size in enumerate(article_sizes):
+            if size == 0:
+                continue
+            users = rng.choice(n_users, size=size, p=user_weights).tolist()
+            draws = rng.random((size, 2)).tolist()
+            # hours between edits in normal periods, minutes during edit wars
+            slow_gaps = rng.exponential(6 * 3600, size=size).astype(np.int64).tolist()
+            fast_gaps = rng.exponential(300, size=size).astype(np.int64).tolist()
+            war_lengths = rng.geometric(0.3, size=size).tolist()
+
+            seconds = start_seconds + int(rng.integers(0, 30 * 86400))
+            times, reverts, versions, editors = [], [], [], []
+            war_left = 0
+            war_users = None
+            for k in range(size):
+                if war_left > 0:
+                    # the two users of the edit war take turns restoring their version
+                    user = war_users[k % 2]
+                    seconds += fast_gaps[k]
+                    revert, version = 1, versions[-2]
+                    war_left -= 1
+                else:
+                    user = users[k]
+                    seconds += slow_gaps[k]
+                    if draws[k][0] < revert_rate and len(versions) >= 2 and editors[-1] != user:
+                        revert, version = 1, versions[-2]
+                        if draws[k][1] < burstiness:
+                            war_users = (user, editors[-1]) if k % 2 == 0 else (editors[-1], user)
+                            war_left = war_lengths[k]
+                    else:
+                        revert, version = 0, next_version
+                        next_version += 1
+                times.append(seconds)
+                reverts.append(revert)
+                versions.append(version)
+                editors.append(user)
+
+            stamps = np.datetime_as_string(np.array(times, dtype='datetime64[s]'), unit='s')
+            title = f"Article_{article}"
+            file.writelines(
+                f"{title}\t{stamps[k].replace('T', ' ')}\t{reverts[k]}\t{versions[k]}\tuser_{editors[k]}\n"
+                for k in range(size - 1, -1, -1)
+            )
+
+def _run_stage(stage, state, mode):
+    """
+    Function runs one stage of the pipeline on the results of the previous stages.
+    """
+    if stage == "read_data":
+        if mode == "table":
+            state["all_edits"] = rn.EditTable.from_file(state["file_path"])
+        else:
+            state["all_edits"] = rn.read_data(state["file_path"])
+    elif stage == "create_user_info":
+        state["edit_counts"], state["user_info_dict"] = rn.create_user_info(state["all_edits"])
+    elif stage == "create_revert_network":
+        state["unique_users"], state["network"] = rn.create_revert_network(state["all_edits"], state["user_info_dict"])
+    elif stage == "create_revert_network_parallel":
+        rn.create_revert_network_parallel(state["all_edits"], state["user_info_dict"], processes=state.get("processes"))
+    elif stage == "count_and_label_AB_BA":
+        state["ab_ba_sequences"], state["network_sorted"] = rn.count_and_label_AB_BA(state["network"])
+    elif stage == "get_seniority_diffs":
+        state["diffs"] = rn.get_seniority_diffs(state["network_sorted"])
+
+def benchmark_file(file_path, mode="list", memory=True, processes=None):
+    """
+    Function runs every stage of the pipeline on a dump and returns a dictionary per stage
+    with the wall time in seconds and, when memory is True, the peak memory in bytes
+    measured with tracemalloc in a second run (tracing slows the code down, so it is not timed).
+    mode is "list" for read_data or "table" for EditTable.from_file.
+    processes is the size of the pool of create_revert_network_parallel (os.cpu_count() by default).
+    """
+    results = []
+    state = {"file_path": file_path, "processes": processes}
+    for stage in STAGES:
+        begin = time.perf_counter()
+        _run_stage(stage, state, mode)
+        results.append({"stage": stage, "seconds": time.perf_counter() - begin})
+    for result in results:
+        result["edges"] = len(state["network"])
+
+    if memory:
+        state = {"file_path": file_path, "processes": processes}
+        for result in results:
+            tracemalloc.start()
+            _run_stage(result["stage"], state, mode)
+            result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+    return results
+
+def run_benchmarks(sizes=(10**4, 10**5, 10**6, 10**7), output="benchmark_results.jsonl", mode="list",
+                   memory=True, directory=None, processes=None, **generator_options):
+    """
+    Function generates a synthetic edit log for every size, benchmarks the pipeline on it and
+    appends one JSON line per stage and size to output, with the machine and library versions,
+    so runs can be compared with compare_results.
+    Extra keyword arguments are passed to generate_edit_log. Returns the list of records.
+    """
+    run = {
+        "run": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "mode": mode,
+        "processes": processes or os.cpu_count(),
+    }
+    records = []
+    with tempfile.TemporaryDirectory(dir=directory) as temp_dir:
+        for n_edits in sizes:
+            file_path = os.path.join(temp_dir, f"edits_{n_edits}.txt")
+            generate_edit_log(file_path, n_edits, **generator_options)
+            for result in benchmark_file(file_path, mode=mode, memory=memory, processes=processes):
+                record = dict(run, n_edits=n_edits, **result)
+                record["edits_per_second"] = n_edits / result["seconds"] if result["seconds"] else None
+                records.append(record)
+            os.remove(file_path)
+
+    if output:
+        with open(output, 'a', encoding='utf-8') as file:
+            for record in records:
+                file.write(json.dumps(record) + "\n")
+    return records
+
+def compare_results(baseline, current, threshold=1.2):
+    """
+    Function compares two lists of benchmark records (or paths to JSON lines files) and returns
+    the (stage, n_edits, ratio) of every stage that got slower by more than threshold times.
+    When a file holds several runs, the last record of every stage and size is used.
+    """
+    def latest(records):
+        if isinstance(records, str):
+            with open(records, 'r', encoding='utf-8') as file:
+                records = [json.loads(line) for line in file if line.strip()]
+        return {(record["stage"], record["n_edits"]): record for record in records}
+
+    baseline, current = latest(baseline), latest(current)
+    regressions = []
+    for key, record in current.items():
+        if key in baseline and baseline[key]["seconds"] > 0:
+            ratio = record["seconds"] / baseline[key]["seconds"]
+            if ratio > threshold:
+                regressions.append((key[0], key[1], ratio))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the reverts_network pipeline on synthetic edit logs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10**4, 10**5, 10**6, 10**7], help="numbers of edits")
+    parser.add_argument("--output", default="benchmark_results.jsonl", help="JSON lines file the results are appended to")
+    parser.add_argument("--mode", choices=["list", "table"], default="list", help="read edits as lists or as an EditTable")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc run")
+    parser.add_argument("--processes", type=int, default=None, help="pool size of the parallel network build")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--articles", type=int, default=None)
+    parser.add_argument("--revert-rate", type=float, default=0.1)
+    parser.add_argument("--burstiness", type=float, default=0.3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compare", default=None, help="earlier results file to check for regressions")
+    args = parser.parse_args()
+
+    records = run_benchmarks(
+        args.sizes, output=args.output, mode=args.mode, memory=not args.no_memory, processes=args.processes, n_users=args.users,
+        n_articles=args.articles, revert_rate=args.revert_rate, burstiness=args.burstiness, seed=args.seed,
+    )
+    for record in records:
+        peak = record.get("peak_bytes")
+        peak = f"{peak / 2**20:9.1f} MB" if peak is not None else ""
+        print(f"{record['n_edits']:>10} {record['stage']:<24} {record['seconds']:10.3f} s {peak}")
+
+    if args.compare:
+        for stage, n_edits, ratio in compare_results(args.compare, records):
+            print(f"Regression: {stage} on {n_edits} edits is {ratio:.2f} times slower")
+
+if __name__ == '__main__':
+    main()
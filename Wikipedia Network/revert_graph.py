@@ -0,0 +1,126 @@
+# Module to analyse the network of reverts as a sparse graph
+# Uses external modules numpy and scipy, and the network built by reverts_network
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from reverts_network import EdgeStore, UserVocab
+
+def to_sparse_adjacency(network, unique_users=None, weight='count'):
+    """
+    Function returns the network of reverts as a SciPy CSR adjacency matrix and the list of
+    users for its rows and columns. Row i and column j hold the reverts of user i against user j.
+    weight is 'count' for the number of reverts or 'seniority' for the sum of the absolute
+    differences in seniority of those reverts.
+    Takes a list of dictionaries or an EdgeStore, and optionally the unique_users set of
+    create_revert_network to fix the users (sorted by name) and include every one of them.
+    """
+    if weight not in ('count', 'seniority'):
+        raise ValueError("weight must be 'count' or 'seniority'")
+
+    # interned user ids give the rows and columns of the matrix
+    if unique_users is not None:
+        vocab = UserVocab(sorted(unique_users))
+    elif isinstance(network, EdgeStore):
+        vocab = network.vocab
+    else:
+        vocab = UserVocab()
+
+    if isinstance(network, EdgeStore):
+        if vocab is network.vocab:
+            rows, columns = network.reverters, network.reverteds
+        else:
+            rows = vocab.encode(network.vocab.decode(network.reverters))
+            columns = vocab.encode(network.vocab.decode(network.reverteds))
+        reverter_seniorities, reverted_seniorities = network.reverter_seniorities, network.reverted_seniorities
+    else:
+        rows = vocab.encode(edge['Reverter'] for edge in network)
+        columns = vocab.encode(edge['Reverted'] for edge in network)
+        reverter_seniorities = np.fromiter((edge['Reverter Seniority'] for edge in network), dtype=np.float64, count=len(network))
+        reverted_seniorities = np.fromiter((edge['Reverted Seniority'] for edge in network), dtype=np.float64, count=len(network))
+
+    if weight == 'count':
+        values = np.ones(len(rows), dtype=np.float64)
+    else:
+        values = np.abs(reverter_seniorities - reverted_seniorities)
+
+    # repeated (reverter, reverted) pairs are summed when converting to CSR; a pair whose
+    # weights sum to 0 keeps its stored cell, so the stored cells are exactly the edges
+    n = len(vocab)
+    matrix = sparse.coo_matrix((values, (rows, columns)), shape=(n, n)).tocsr()
+    return matrix, list(vocab.names)
+
+def _edge_pattern(matrix):
+    """
+    Function returns a CSR matrix with a 1 for every stored cell of matrix, whatever its weight,
+    so that edges with a weight of 0 (e.g. reverts between users of equal seniority) still count.
+    Self-loops are left out, since they can't happen in the revert network.
+    """
+    coo = sparse.coo_matrix(matrix)
+    keep = coo.row != coo.col
+    pattern = sparse.coo_matrix(
+        (np.ones(np.count_nonzero(keep)), (coo.row[keep], coo.col[keep])), shape=matrix.shape
+    ).tocsr()
+    # duplicate coordinates are summed by tocsr, set them back to 1
+    pattern.data[:] = 1
+    return pattern
+
+def degree_distributions(matrix):
+    """
+    Function returns a dictionary with the out-degree and in-degree (number of distinct users
+    reverted and reverted by) and the out-strength and in-strength (sum of the weights) of every user.
+    The degrees count every edge of the matrix, also those with a weight of 0.
+    """
+    binary = _edge_pattern(matrix)
+    return {
+        "out_degree": np.asarray(binary.sum(axis=1)).ravel().astype(np.int64),
+        "in_degree": np.asarray(binary.sum(axis=0)).ravel().astype(np.int64),
+        "out_strength": np.asarray(matrix.sum(axis=1)).ravel(),
+        "in_strength": np.asarray(matrix.sum(axis=0)).ravel(),
+    }
+
+def pagerank(matrix, damping=0.85, tol=1e-10, max_iter=100):
+    """
+    Function returns the PageRank of every user by power iteration, following edges from the
+    reverter to the reverted in proportion to their weights. Users who reverted no one spread
+    their rank evenly over all users.
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return np.zeros(0)
+
+    out_strength = np.asarray(matrix.sum(axis=1)).ravel()
+    dangling = out_strength == 0
+    # row-normalize the weights so every row with edges sums to 1
+    inverse = np.zeros(n)
+    inverse[~dangling] = 1.0 / out_strength[~dangling]
+    transition = sparse.diags(inverse) @ matrix
+    transition_t = transition.T.tocsr()
+
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new_rank = damping * (transition_t @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(new_rank - rank).sum() < tol:
+            return new_rank
+        rank = new_rank
+    return rank
+
+def reciprocity(matrix):
+    """
+    Function returns the share of connected (reverter, reverted) pairs whose reverse pair is
+    also connected, i.e. where both users reverted each other at least once. NaN without edges.
+    Edges with a weight of 0 count like any other.
+    """
+    binary = _edge_pattern(matrix)
+    if binary.nnz == 0:
+        return float('nan')
+    return binary.multiply(binary.T).nnz / binary.nnz
+
+def connected_components(matrix, connection='weak'):
+    """
+    Function returns the number of connected components and the component label of every user.
+    connection is 'weak' to ignore the direction of reverts or 'strong' to follow it.
+    Edges with a weight of 0 connect users like any other.
+    """
+    return csgraph.connected_components(_edge_pattern(matrix), directed=True, connection=connection)
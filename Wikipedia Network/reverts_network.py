@@ -3,46 +3,529 @@
 
 from datetime import datetime
 from datetime import timedelta
+from collections import deque
+import bisect
+import bz2
+import contextlib
+import glob
+import gzip
+import hashlib
+import json
+import lzma
+import multiprocessing
+import os
+import pickle
+import shutil
+import time
+import tracemalloc
 
 import numpy as np
 
-def read_data(file_path, skipped_lines=1):
+# Counters of the work done by the pipeline that PipelineStats records
+COUNTERS = ("lines_parsed", "reverts_seen", "self_reverts", "unresolved_reverts", "seniority_lookups", "ab_ba_comparisons")
+
+class PipelineStats:
+    """
+    Record of the wall time, peak memory and amount of work of each stage of the pipeline.
+    Pass the same object as stats to read_data (or read_dumps, EditTable.from_file, load_edits_cached), 
+    create_user_info, create_revert_network (or create_revert_network_parallel), 
+    count_and_label_AB_BA and get_seniority_diffs; without it nothing is measured.
+    Peak memory is only measured with memory=True, since tracemalloc slows the code down.
+    callback, if given, is called with the stage name and its record when a stage ends.
+    """
+    def __init__(self, memory=False, callback=None):
+        self.memory = memory
+        self.callback = callback
+        # stage name -> {"calls", "seconds", "peak_bytes"}
+        self.stages = {}
+        self.counters = dict.fromkeys(COUNTERS, 0)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """
+        Context manager that measures one run of the stage name.
+        """
+        started = False
+        if self.memory:
+            if tracemalloc.is_tracing():
+                tracemalloc.reset_peak()
+            else:
+                tracemalloc.start()
+                started = True
+        begin = time.perf_counter()
+        try:
+            yield self
+        finally:
+            seconds = time.perf_counter() - begin
+            record = self.stages.setdefault(name, {"calls": 0, "seconds": 0.0, "peak_bytes": None})
+            record["calls"] += 1
+            record["seconds"] += seconds
+            if self.memory:
+                peak = tracemalloc.get_traced_memory()[1]
+                if started:
+                    tracemalloc.stop()
+                record["peak_bytes"] = max(record["peak_bytes"] or 0, peak)
+            if self.callback is not None:
+                self.callback(name, record)
+
+    def add(self, counter, n=1):
+        """
+        Adds n to one of the COUNTERS.
+        """
+        self.counters[counter] += int(n)
+
+    def as_dict(self):
+        """
+        Function returns the stages and counters as a dictionary, e.g. to save as JSON.
+        """
+        return {"stages": {name: dict(record) for name, record in self.stages.items()}, "counters": dict(self.counters)}
+
+    def report(self):
+        """
+        Function returns a table of the stages and counters as a string.
+        """
+        lines = []
+        for name, record in self.stages.items():
+            peak = record["peak_bytes"]
+            peak = f"{peak / 2**20:9.1f} MB" if peak is not None else ""
+            lines.append(f"{name:<24} {record['seconds']:10.3f} s {peak}")
+        for counter, value in self.counters.items():
+            lines.append(f"{counter:<24} {value:>10}")
+        return "\n".join(lines)
+
+def _stage(stats, name):
+    """
+    Function returns the context manager measuring the stage name, which does nothing when stats is None.
+    """
+    return contextlib.nullcontext() if stats is None else stats.stage(name)
+
+def parse_timestamp(timestamp):
+    """
+    Function converts a timestamp string in the format "%Y-%m-%d %H:%M:%S"
+    to a datetime object.
+    Uses datetime.fromisoformat for strings in exactly that layout, which is
+    several times faster than datetime.strptime, and falls back on strptime otherwise.
+    """
+    # the dumps always use the fixed "YYYY-MM-DD HH:MM:SS" layout, which fromisoformat parses in C;
+    # checking every separator and digit keeps out the other layouts fromisoformat accepts, like time zones
+    if (len(timestamp) == 19 and timestamp[4] == "-" and timestamp[7] == "-" and timestamp[10] == " "
+            and timestamp[13] == ":" and timestamp[16] == ":" and timestamp.isascii()
+            and (timestamp[0:4] + timestamp[5:7] + timestamp[8:10] + timestamp[11:13] + timestamp[14:16] + timestamp[17:19]).isdigit()):
+        try:
+            return datetime.fromisoformat(timestamp)
+        except ValueError:
+            # out of range fields such as month 13: let strptime raise its usual error
+            pass
+    # anything else goes through strptime so that malformed timestamps raise the same error as before
+    return datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+
+def _split_line(line):
+    """
+    Function splits one line of the dump into a list of title, timestamp string, 
+    revert, version and user.
+    """
+    # split the line into the title, timestamp, revert, version and user on tab
+    title, timestamp, revert, version, user = line.split("\t")
+
+    # strip the title and timestamp of any extra spaces
+    return [title.rstrip(), timestamp.strip(), int(revert), int(version), user.replace('\n', "")]
+
+def _open_dump(file_path):
+    """
+    Function opens a dump for reading text, decompressing it on the fly 
+    when the file name ends in .gz, .bz2 or .xz.
+    """
+    if file_path.endswith('.gz'):
+        return gzip.open(file_path, 'rt', encoding='utf-8')
+    if file_path.endswith('.bz2'):
+        return bz2.open(file_path, 'rt', encoding='utf-8')
+    if file_path.endswith('.xz'):
+        return lzma.open(file_path, 'rt', encoding='utf-8')
+    return open(file_path, 'r', encoding='utf-8')
+
+def iter_edits(file_path, skipped_lines=1):
+    """
+    Function reads the data from the file one line at a time and yields 
+    each edit as a list of title, timestamp, revert, version and user.
+    It skips the first line by default and closes the file when done.
+    .gz, .bz2 and .xz files are decompressed on the fly.
+    """
+    with _open_dump(file_path) as file:
+        # skip the header lines of the file
+        for _ in range(skipped_lines):
+            if not file.readline():
+                return
+
+        for line in file:
+            edit = _split_line(line)
+            # convert the timestamp to datetime object so that dates can be compared
+            edit[1] = parse_timestamp(edit[1])
+            yield edit
+
+def read_data_chunks(file_path, skipped_lines=1, chunk_size=100000):
+    """
+    Function reads the data from the file and yields lists of at most chunk_size edits,
+    so that the file can be processed in constant memory.
+    It skips the first line by default.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be a positive integer")
+
+    chunk = []
+    for edit in iter_edits(file_path, skipped_lines):
+        chunk.append(edit)
+        # hand over the chunk as soon as it is full and start a new one
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+
+    # the last chunk is usually not full
+    if chunk:
+        yield chunk
+
+def read_data(file_path, skipped_lines=1, stats=None):
     """
     Function reads the data from the file and returns a list of lists.
     It skips the first line by default.
+    stats is an optional PipelineStats that records the stage and the lines parsed.
+    """
+    with _stage(stats, "read_data"):
+        all_edits = list(iter_edits(file_path, skipped_lines))
+    if stats is not None:
+        stats.add("lines_parsed", len(all_edits))
+    return all_edits
+
+def _read_dump(args):
     """
-    # initialize the list of all edits
-    i = 1
-    all_edits = []
+    Function reads one dump into an EditTable in a worker process of read_dumps.
+    """
+    file_path, skipped_lines = args
+    return EditTable.from_file(file_path, skipped_lines)
 
-    for line in open(file_path, 'r', encoding='utf-8'):
-        # skip the first line of the file
-        if i <= skipped_lines:
-            i += 1
-            continue
-        # split the line into the title, timestamp, revert, version and user on tab
-        title, timestamp, revert, version, user = line.split("\t")
+def read_dumps(file_paths, skipped_lines=1, processes=None, table=False, stats=None):
+    """
+    Function reads several dumps and returns one list of lists in reverse chronological order, 
+    as expected by create_revert_network, or an EditTable when table is True.
+    Takes a glob pattern or a list of paths and patterns; plain, .gz, .bz2 and .xz files 
+    can be mixed. The files are decompressed and parsed in parallel by a pool of processes.
+    skipped_lines header lines are skipped in every file.
+    Every worker sends back an EditTable, whose NumPy columns are cheap to pickle, and the tables 
+    are merged and sorted in the parent. Only a list output builds Python rows, in the parent.
+    stats is an optional PipelineStats that records the read_data stage and the lines parsed.
+    """
+    if stats is not None:
+        with stats.stage("read_data"):
+            all_edits = read_dumps(file_paths, skipped_lines, processes, table)
+        stats.add("lines_parsed", len(all_edits))
+        return all_edits
 
-        # strip the title and timestamp of any extra spaces
-        timestamp = timestamp.strip()
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
 
-        # convert the timestamp to datetime object so that dates can be compared
-        time = datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
-        title = title.rstrip()
-        user = user.replace('\n', "")
+    # expand the patterns, keeping paths without wildcards even if they don't exist so that open fails loudly
+    paths = []
+    for pattern in file_paths:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(matches)
+    if not paths:
+        raise FileNotFoundError(f"No dump files match {file_paths}")
 
-        # create a list of the title, timestamp, revert, version and user and append it to the list of all edits
-        ls = [title, time, int(revert), int(version), user]
-        all_edits.append(ls)
+    if processes is None:
+        processes = min(len(paths), os.cpu_count() or 1)
+    if processes > 1 and len(paths) > 1:
+        with multiprocessing.Pool(processes) as pool:
+            parts = pool.map(_read_dump, [(path, skipped_lines) for path in paths])
+    else:
+        parts = [_read_dump((path, skipped_lines)) for path in paths]
 
-    return all_edits
+    # a stable sort by time keeps the order of every article within and across the files
+    merged = EditTable.concatenate(parts)
+    merged = merged.take(np.argsort(-merged.timestamps.astype(np.int64), kind='stable'))
+    return merged if table else merged.to_list()
+
+# Names of the NumPy columns of an EditTable, in the order of the constructor
+_EDIT_TABLE_COLUMNS = ["title_codes", "timestamps", "reverts", "versions", "user_codes"]
+
+class EditTable:
+    """
+    Columnar table of edits backed by NumPy arrays, used in place of the list of lists 
+    returned by read_data.
+    Titles and users are stored as integer codes into the titles and users lists, 
+    timestamps as datetime64[s], the revert flag as int8 and the version as int64.
+    Rows keep the order of the file.
+    """
+    def __init__(self, title_codes, timestamps, reverts, versions, user_codes, titles, users):
+        self.title_codes = np.asarray(title_codes, dtype=np.int32)
+        self.timestamps = np.asarray(timestamps, dtype='datetime64[s]')
+        self.reverts = np.asarray(reverts, dtype=np.int8)
+        self.versions = np.asarray(versions, dtype=np.int64)
+        self.user_codes = np.asarray(user_codes, dtype=np.int32)
+        # lists of the distinct titles and users, in order of first appearance
+        self.titles = list(titles)
+        self.users = list(users)
+
+        n = len(self.timestamps)
+        if not all(len(column) == n for column in [self.title_codes, self.reverts, self.versions, self.user_codes]):
+            raise ValueError("All columns must have the same length")
+
+    @classmethod
+    def from_chunks(cls, chunks):
+        """
+        Function builds the table from an iterable of lists of edits, 
+        such as the output of read_data_chunks.
+        Timestamps can be datetime objects or "%Y-%m-%d %H:%M:%S" strings.
+        """
+        # dictionaries that give every title and user the next free integer code
+        title_index = {}
+        user_index = {}
+        columns = [[], [], [], [], []]
+
+        for chunk in chunks:
+            count = len(chunk)
+            columns[0].append(np.fromiter((title_index.setdefault(edit[0], len(title_index)) for edit in chunk), dtype=np.int32, count=count))
+            columns[1].append(np.array([edit[1] for edit in chunk], dtype='datetime64[s]'))
+            columns[2].append(np.fromiter((edit[2] for edit in chunk), dtype=np.int8, count=count))
+            columns[3].append(np.fromiter((edit[3] for edit in chunk), dtype=np.int64, count=count))
+            columns[4].append(np.fromiter((user_index.setdefault(edit[4], len(user_index)) for edit in chunk), dtype=np.int32, count=count))
+
+        # an empty input still needs typed empty columns
+        dtypes = [np.int32, 'datetime64[s]', np.int8, np.int64, np.int32]
+        arrays = [np.concatenate(column) if column else np.array([], dtype=dtype) for column, dtype in zip(columns, dtypes)]
+        return cls(*arrays, titles=title_index, users=user_index)
+
+    @classmethod
+    def from_edits(cls, all_edits):
+        """
+        Function builds the table from a list of edits as returned by read_data.
+        """
+        return cls.from_chunks([all_edits])
+
+    @classmethod
+    def from_file(cls, file_path, skipped_lines=1, chunk_size=100000, stats=None):
+        """
+        Function reads the data from the file straight into a table.
+        The timestamps are parsed by NumPy one chunk at a time, so no datetime objects are created.
+        It skips the first line by default.
+        stats is an optional PipelineStats that records the read_data stage and the lines parsed.
+        """
+        if stats is not None:
+            with stats.stage("read_data"):
+                table = cls.from_file(file_path, skipped_lines, chunk_size)
+            stats.add("lines_parsed", len(table))
+            return table
+
+        def raw_chunks():
+            with _open_dump(file_path) as file:
+                for _ in range(skipped_lines):
+                    if not file.readline():
+                        return
+                chunk = []
+                for line in file:
+                    chunk.append(_split_line(line))
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = []
+                if chunk:
+                    yield chunk
+
+        return cls.from_chunks(raw_chunks())
+
+    def __len__(self):
+        return len(self.timestamps)
 
-def create_user_info(all_edits):
+    def __getitem__(self, i):
+        """
+        Returns row i as a list of title, timestamp, revert, version and user, like read_data.
+        """
+        return [
+            self.titles[self.title_codes[i]],
+            self.timestamps[i].item(),
+            int(self.reverts[i]),
+            int(self.versions[i]),
+            self.users[self.user_codes[i]],
+        ]
+
+    def to_list(self):
+        """
+        Returns the table as a list of lists, like read_data.
+        The columns are converted to Python objects in one call each instead of row by row.
+        """
+        titles = self.titles
+        users = self.users
+        return [
+            [titles[title_code], timestamp, revert, version, users[user_code]]
+            for title_code, timestamp, revert, version, user_code in zip(
+                self.title_codes.tolist(), self.timestamps.tolist(), self.reverts.tolist(),
+                self.versions.tolist(), self.user_codes.tolist(),
+            )
+        ]
+
+    def take(self, positions):
+        """
+        Returns a new table with the rows at positions, sharing the lists of names.
+        """
+        return EditTable(
+            self.title_codes[positions], self.timestamps[positions], self.reverts[positions],
+            self.versions[positions], self.user_codes[positions], titles=self.titles, users=self.users,
+        )
+
+    @classmethod
+    def concatenate(cls, tables):
+        """
+        Function returns one table with the rows of all the tables in turn, 
+        giving the titles and users new codes in order of first appearance.
+        """
+        columns = [[], [], [], [], []]
+        title_index = {}
+        user_index = {}
+        for table in tables:
+            # code of every name of this table in the merged lists
+            title_map = np.array([title_index.setdefault(title, len(title_index)) for title in table.titles], dtype=np.int32)
+            user_map = np.array([user_index.setdefault(user, len(user_index)) for user in table.users], dtype=np.int32)
+            columns[0].append(title_map[table.title_codes] if len(table) else table.title_codes)
+            columns[1].append(table.timestamps)
+            columns[2].append(table.reverts)
+            columns[3].append(table.versions)
+            columns[4].append(user_map[table.user_codes] if len(table) else table.user_codes)
+
+        dtypes = [np.int32, 'datetime64[s]', np.int8, np.int64, np.int32]
+        arrays = [np.concatenate(column) if column else np.array([], dtype=dtype) for column, dtype in zip(columns, dtypes)]
+        return cls(*arrays, titles=title_index, users=user_index)
+
+    def save(self, directory):
+        """
+        Saves the table to a directory, one uncompressed .npy file per column 
+        and one JSON file per list of names, so that it can be memory-mapped by load.
+        JSON keeps every name as it is, including empty names and names with line breaks.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name in _EDIT_TABLE_COLUMNS:
+            np.save(os.path.join(directory, name + ".npy"), getattr(self, name))
+        for name in ["titles", "users"]:
+            with open(os.path.join(directory, name + ".json"), 'w', encoding='utf-8') as file:
+                json.dump(getattr(self, name), file, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory, mmap_mode='r'):
+        """
+        Loads a table saved with save. The columns are memory-mapped by default.
+        """
+        columns = [np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode) for name in _EDIT_TABLE_COLUMNS]
+        names = []
+        for name in ["titles", "users"]:
+            with open(os.path.join(directory, name + ".json"), 'r', encoding='utf-8') as file:
+                names.append(json.load(file))
+        return cls(*columns, titles=names[0], users=names[1])
+
+# Version of the layout of the cache directories written by load_edits_cached
+# (2: the names of an EditTable are saved as JSON)
+_CACHE_FORMAT = 2
+
+def _file_digest(file_path):
+    """
+    Function returns the BLAKE2 hash of the content of a file, read in 1 MB blocks.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_edits_cached(file_path, skipped_lines=1, cache_dir=None, stats=None):
+    """
+    Function returns the edits of the file as a memory-mapped EditTable, parsing the file 
+    only when there is no valid cache for it.
+    The cache lives in cache_dir (a .edit_cache directory next to the file by default) and 
+    is keyed by the path of the file and skipped_lines. It is valid while the size and 
+    modification time of the file match; if only the modification time changed, the content 
+    hash decides. Otherwise the file is parsed again and the cache rebuilt.
+    stats is an optional PipelineStats that records the read_data stage and, as lines parsed, 
+    the edits of the table, whether they come from the cache or the file.
+    """
+    if stats is not None:
+        with stats.stage("read_data"):
+            table = load_edits_cached(file_path, skipped_lines, cache_dir)
+        stats.add("lines_parsed", len(table))
+        return table
+
+    file_path = os.path.abspath(file_path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(file_path), ".edit_cache")
+    key = hashlib.blake2b(f"{file_path}\t{skipped_lines}".encode('utf-8'), digest_size=8).hexdigest()
+    cache_path = os.path.join(cache_dir, f"{os.path.basename(file_path)}-{key}")
+    meta_path = os.path.join(cache_path, "meta.json")
+
+    stat = os.stat(file_path)
+    meta = None
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r', encoding='utf-8') as file:
+            meta = json.load(file)
+        # caches written in an older layout are rebuilt
+        if meta.get("format") != _CACHE_FORMAT:
+            meta = None
+
+    # warm load: nothing about the file changed
+    if meta is not None and meta["size"] == stat.st_size and meta["mtime_ns"] == stat.st_mtime_ns:
+        return EditTable.load(cache_path)
+
+    digest = _file_digest(file_path)
+    # the file was touched but its content is the same
+    if meta is not None and meta["size"] == stat.st_size and meta["digest"] == digest:
+        meta["mtime_ns"] = stat.st_mtime_ns
+        with open(meta_path, 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+        return EditTable.load(cache_path)
+
+    # parse the file and write the new cache next to the old one, then swap them
+    table = EditTable.from_file(file_path, skipped_lines)
+    temp_path = cache_path + ".tmp"
+    if os.path.exists(temp_path):
+        shutil.rmtree(temp_path)
+    table.save(temp_path)
+    meta = {
+        "format": _CACHE_FORMAT, "path": file_path, "skipped_lines": skipped_lines,
+        "size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": digest,
+    }
+    with open(os.path.join(temp_path, "meta.json"), 'w', encoding='utf-8') as file:
+        json.dump(meta, file)
+    if os.path.exists(cache_path):
+        shutil.rmtree(cache_path)
+    os.replace(temp_path, cache_path)
+    return EditTable.load(cache_path)
+
+def _create_user_info_table(table):
+    """
+    Function returns the edit counts and time stamps of each user of an EditTable,
+    with one vectorized pass over the user column.
+    The time stamps of each user are a datetime64 array in the order of the file.
+    """
+    counts = np.bincount(table.user_codes, minlength=len(table.users))
+    # a stable sort keeps the edits of each user in the order of the file
+    order = np.argsort(table.user_codes, kind='stable')
+    user_times = np.split(table.timestamps[order], np.cumsum(counts)[:-1])
+
+    edit_counts = {}
+    user_info_dict = {}
+    for code, user in enumerate(table.users):
+        if counts[code]:
+            edit_counts[user] = int(counts[code])
+            user_info_dict[user] = user_times[code]
+    return edit_counts, user_info_dict
+
+def create_user_info(all_edits, stats=None):
     """
     Function returns a dictionary of edit counts and a dictionary user_info_dict 
     which contains the time stamps of each edit for each user.
-    Takes for argument the list of all edits.
+    Takes for argument the list of all edits or an EditTable.
+    stats is an optional PipelineStats that records the stage.
     """
+    if stats is not None:
+        with stats.stage("create_user_info"):
+            return create_user_info(all_edits)
+
+    if isinstance(all_edits, EditTable):
+        return _create_user_info_table(all_edits)
+
     # create a list of the time and user for each edit
     time_user_list = [[item[1], item[4]] for item in all_edits]
     
@@ -74,6 +557,11 @@ def get_seniority_before_revert(user, revert_time, user_info_dict):
     of the user before the revert_time.
     Takes for argument the user, revert time, and the dictionary of user_info_dict.
     """
+    # Time stamps that come from an EditTable are a datetime64 array, count them in one pass
+    if isinstance(user_info_dict[user], np.ndarray):
+        edit_count = int(np.count_nonzero(user_info_dict[user] < np.datetime64(revert_time, 's')))
+        return np.log10(edit_count) if edit_count else 0
+
     # Filter user edits before the revert_time
     user_edits_before_revert = [edit_time for edit_time in user_info_dict[user] if edit_time < revert_time]
 
@@ -94,73 +582,643 @@ def get_seniority_before_revert(user, revert_time, user_info_dict):
     return seniority
 
 
-def create_revert_network(all_edits, user_info_dict):
+# proleptic Gregorian ordinal of 1970-01-01, the epoch of datetime64
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+def _to_seconds(times):
+    """
+    Function converts datetime objects, datetime64 values or lists of either 
+    to int64 seconds since the epoch.
+    """
+    # NumPy converts datetime objects one at a time and slowly, so lists of them are worked out from their fields
+    if isinstance(times, list) and times and isinstance(times[0], datetime):
+        return np.fromiter(
+            ((stamp.toordinal() - _EPOCH_ORDINAL) * 86400 + stamp.hour * 3600 + stamp.minute * 60 + stamp.second for stamp in times),
+            dtype=np.int64, count=len(times),
+        )
+    return np.asarray(times, dtype='datetime64[s]').astype(np.int64)
+
+class SeniorityIndex:
+    """
+    Index of the edit time stamps of every user, built once from the user_info_dict 
+    returned by create_user_info.
+    All time stamps are kept in one array sorted by user and then by time, so the number 
+    of edits a user made before a revert is found by binary search instead of a scan.
+    Gives the same seniority as get_seniority_before_revert: edits at the revert time are excluded.
+    """
+    def __init__(self, user_info_dict):
+        # give every user a dense integer code
+        self.user_codes = {user: code for code, user in enumerate(user_info_dict)}
+        counts = np.array([len(times) for times in user_info_dict.values()], dtype=np.int64)
+        seconds = _to_seconds([]) if counts.sum() == 0 else np.concatenate([_to_seconds(times) for times in user_info_dict.values()])
+
+        # offsets[code] is where the time stamps of a user start in the sorted array
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+        self.start = int(seconds.min()) if len(seconds) else 0
+        # span is larger than any time offset, so code * span + offset sorts by user and then by time
+        self.span = (int(seconds.max()) - self.start + 2) if len(seconds) else 2
+        codes = np.repeat(np.arange(len(counts), dtype=np.int64), counts)
+        self.keys = np.sort(codes * self.span + (seconds - self.start))
+
+    def edit_counts_before(self, users, revert_times):
+        """
+        Returns an array with the number of edits each user made strictly before 
+        the matching revert time.
+        """
+        codes = np.fromiter((self.user_codes[user] for user in users), dtype=np.int64)
+        # times outside the indexed range are clipped, which keeps the counts the same
+        offsets = np.clip(_to_seconds(revert_times) - self.start, 0, self.span - 1)
+        # a left binary search stops before any edit made at the revert time itself
+        return np.searchsorted(self.keys, codes * self.span + offsets, side='left') - self.offsets[codes]
+
+    def seniorities(self, users, revert_times):
+        """
+        Returns an array with the seniority (log10 of the edit count, 0 without edits)
+        of each user before the matching revert time.
+        """
+        edit_counts = self.edit_counts_before(users, revert_times)
+        seniority = np.zeros(len(edit_counts))
+        np.log10(edit_counts, out=seniority, where=edit_counts > 0)
+        return seniority
+
+    def revert_seniorities(self, reverters, reverteds, revert_times):
+        """
+        Returns two arrays with the seniority of the reverter and of the reverted user 
+        before every revert, in one vectorized call.
+        """
+        revert_times = _to_seconds(revert_times)
+        return self.seniorities(reverters, revert_times), self.seniorities(reverteds, revert_times)
+
+    def seniority(self, user, revert_time):
+        """
+        Returns the seniority of a single user before the given revert_time.
+        """
+        return self.seniorities([user], [revert_time])[0]
+
+class UserVocab:
+    """
+    Vocabulary that maps user names to dense integer ids (in order of first appearance) and back.
+    """
+    def __init__(self, names=()):
+        self.names = []
+        self.ids = {}
+        for name in names:
+            self.add(name)
+
+    def add(self, name):
+        """
+        Returns the id of name, giving it the next free id if it is new.
+        """
+        user_id = self.ids.get(name)
+        if user_id is None:
+            user_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return user_id
+
+    def encode(self, names):
+        """
+        Returns an int32 array with the ids of names, adding the new ones.
+        """
+        return np.fromiter((self.add(name) for name in names), dtype=np.int32)
+
+    def decode(self, ids):
+        """
+        Returns the list of names of ids.
+        """
+        return [self.names[user_id] for user_id in ids]
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.ids
+
+class EdgeStore:
+    """
+    Compact store of the edges of a revert network as parallel NumPy arrays: 
+    int32 reverter and reverted ids into vocab, datetime64[s] time stamps, float64 seniorities 
+    and, once labelled, a bool AB-BA column.
+    An edge takes about 33 bytes instead of a dictionary with five keys and two name strings.
+    Indexing or iterating gives the same dictionaries as create_revert_network, for backward compatibility.
+    """
+    def __init__(self, reverters, reverteds, times, reverter_seniorities, reverted_seniorities, vocab, ab_ba=None):
+        self.reverters = np.asarray(reverters, dtype=np.int32)
+        self.reverteds = np.asarray(reverteds, dtype=np.int32)
+        self.times = np.asarray(times, dtype='datetime64[s]')
+        self.reverter_seniorities = np.asarray(reverter_seniorities, dtype=np.float64)
+        self.reverted_seniorities = np.asarray(reverted_seniorities, dtype=np.float64)
+        self.vocab = vocab
+        self.ab_ba = None if ab_ba is None else np.asarray(ab_ba, dtype=bool)
+
+    @classmethod
+    def from_network(cls, network, vocab=None):
+        """
+        Function builds the store from a list of edge dictionaries.
+        """
+        if vocab is None:
+            vocab = UserVocab()
+        ab_ba = None
+        if network and all('AB-BA' in edge for edge in network):
+            ab_ba = [edge['AB-BA'] for edge in network]
+        return cls(
+            vocab.encode(edge['Reverter'] for edge in network),
+            vocab.encode(edge['Reverted'] for edge in network),
+            np.array([edge['Time stamp'] for edge in network], dtype='datetime64[s]'),
+            [edge['Reverter Seniority'] for edge in network],
+            [edge['Reverted Seniority'] for edge in network],
+            vocab,
+            ab_ba,
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    def __getitem__(self, k):
+        """
+        Returns edge k as a dictionary, like the edges of create_revert_network.
+        """
+        edge = {
+            "Reverter": self.vocab.names[self.reverters[k]],
+            "Reverted": self.vocab.names[self.reverteds[k]],
+            "Time stamp": self.times[k].item(),
+            "Reverter Seniority": self.reverter_seniorities[k],
+            "Reverted Seniority": self.reverted_seniorities[k],
+        }
+        if self.ab_ba is not None:
+            edge['AB-BA'] = bool(self.ab_ba[k])
+        return edge
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self)))
+
+    def to_network(self):
+        """
+        Returns the edges as a list of dictionaries.
+        """
+        return list(self)
+
+    def take(self, indices):
+        """
+        Returns a new store with the edges at indices, sharing the vocabulary.
+        """
+        return EdgeStore(
+            self.reverters[indices], self.reverteds[indices], self.times[indices],
+            self.reverter_seniorities[indices], self.reverted_seniorities[indices], self.vocab,
+            None if self.ab_ba is None else self.ab_ba[indices],
+        )
+
+    def sorted_by_time(self):
+        """
+        Returns a new store sorted by time stamp, keeping the order of edges with the same time stamp.
+        """
+        return self.take(np.argsort(self.times, kind='stable'))
+
+class RevertIndex:
+    """
+    Query index over a revert network (a list of dictionaries or an EdgeStore) for time-range 
+    and per-user queries.
+    Keeps the edge positions sorted by time, and sorted by user and then time for reverters 
+    and for reverted users, with offset tables marking where each user starts.
+    Queries use binary search and return slices of these arrays, i.e. views of edge positions 
+    into the network, without copying. Time ranges include start and exclude end; None leaves 
+    a side open.
+    """
+    def __init__(self, network):
+        self.store = network if isinstance(network, EdgeStore) else EdgeStore.from_network(network)
+        self.vocab = self.store.vocab
+        seconds = _to_seconds(self.store.times)
+
+        # edge positions sorted by time, keeping the network order for equal time stamps
+        self.time_order = np.argsort(seconds, kind='stable')
+        self.sorted_seconds = seconds[self.time_order]
+        self._by_reverter = self._user_order(self.store.reverters, seconds)
+        self._by_reverted = self._user_order(self.store.reverteds, seconds)
+
+    def _user_order(self, codes, seconds):
+        """
+        Returns the edge positions sorted by user and time, their times, and the offset of every user.
+        """
+        order = np.lexsort((seconds, codes))
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(self.vocab)))])
+        return order, seconds[order], offsets
+
+    @staticmethod
+    def _bounds(sorted_seconds, start, end):
+        """
+        Returns the slice of sorted_seconds that falls in [start, end).
+        """
+        low = 0 if start is None else np.searchsorted(sorted_seconds, int(_to_seconds(start)), side='left')
+        high = len(sorted_seconds) if end is None else np.searchsorted(sorted_seconds, int(_to_seconds(end)), side='left')
+        return low, max(low, high)
+
+    def between(self, start=None, end=None):
+        """
+        Returns the positions of the edges with start <= time stamp < end, in time order.
+        """
+        low, high = self._bounds(self.sorted_seconds, start, end)
+        return self.time_order[low:high]
+
+    def _user_query(self, table, user, start, end):
+        order, sorted_seconds, offsets = table
+        code = self.vocab.ids.get(user)
+        if code is None:
+            return order[:0]
+        first, last = offsets[code], offsets[code + 1]
+        low, high = self._bounds(sorted_seconds[first:last], start, end)
+        return order[first + low:first + high]
+
+    def by_reverter(self, user, start=None, end=None):
+        """
+        Returns the positions of the reverts made by user in [start, end), in time order.
+        """
+        return self._user_query(self._by_reverter, user, start, end)
+
+    def against(self, user, start=None, end=None):
+        """
+        Returns the positions of the reverts against user in [start, end), in time order.
+        """
+        return self._user_query(self._by_reverted, user, start, end)
+
+    def involving(self, user, start=None, end=None):
+        """
+        Returns the positions of the reverts by or against user in [start, end), in time order.
+        Unlike the other queries this merges two slices, so it returns a new array.
+        """
+        positions = np.concatenate([self.by_reverter(user, start, end), self.against(user, start, end)])
+        return positions[np.argsort(_to_seconds(self.store.times[positions]), kind='stable')]
+
+    def edges(self, positions):
+        """
+        Returns the edges at positions as a list of dictionaries.
+        """
+        return [self.store[k] for k in positions]
+
+def _network_from_reverts(reverts, user_info_dict, seniority_index=None, compact=False):
+    """
+    Function returns the unique users and the network of reverts for a list of 
+    (reverter, reverted, time stamp) tuples, with the seniorities of all reverts 
+    computed in one batch. The network is an EdgeStore when compact is True.
+    """
+    if seniority_index is None:
+        seniority_index = SeniorityIndex(user_info_dict)
+
+    reverters = [revert[0] for revert in reverts]
+    reverteds = [revert[1] for revert in reverts]
+    reverter_seniorities, reverted_seniorities = seniority_index.revert_seniorities(
+        reverters, reverteds, [revert[2] for revert in reverts]
+    )
+
+    # set of all users involved in reverts
+    unique_users = set(reverters)
+    unique_users.update(reverteds)
+
+    if compact:
+        vocab = UserVocab()
+        network = EdgeStore(
+            vocab.encode(reverters), vocab.encode(reverteds), [revert[2] for revert in reverts],
+            reverter_seniorities, reverted_seniorities, vocab,
+        )
+        return unique_users, network
+
+    network = [
+        {
+            "Reverter": reverter_user,
+            "Reverted": reverted_user,
+            "Time stamp": time_stamp,
+            "Reverter Seniority": reverter_seniority,
+            "Reverted Seniority": reverted_seniority,
+        }
+        for (reverter_user, reverted_user, time_stamp), reverter_seniority, reverted_seniority
+        in zip(reverts, reverter_seniorities, reverted_seniorities)
+    ]
+    return unique_users, network
+
+
+def resolve_reverts(all_edits):
+    """
+    Function matches every revert to the edit it reverted, in a single pass from the 
+    bottom of the file (the oldest edit) to the top.
+    A (title, version) -> position index of the latest edit of every article version 
+    lets each revert find the version it restores in O(1). The reverted edit is the one 
+    that followed the restored version in the same article.
+    Returns the positions of the reverts, the positions of the reverted edits and the 
+    positions of unresolved reverts (whose version never appeared earlier in the article).
+    all_edits can also be an EditTable, in which case the three results are arrays.
+    """
+    if isinstance(all_edits, EditTable):
+        return _resolve_reverts_table(all_edits)
+
+    # (title, version) -> [position of the latest edit with that version, position of the edit that followed it]
+    version_index = {}
+    # title -> index entry of the latest edit of the article
+    latest_in_title = {}
+
+    revert_positions = []
+    reverted_positions = []
+    unresolved = []
+    # Iterate through all edits in reverse order (since the file is in reverse chronological order)
+    for i in range(len(all_edits) - 1, -1, -1):
+        title = all_edits[i][0]
+        key = (title, all_edits[i][3])
+
+        # this edit follows the previous edit of the same article
+        previous = latest_in_title.get(title)
+        if previous is not None:
+            previous[1] = i
+
+        # Check if the edit is a revert using column "revert"
+        if all_edits[i][2] == 1:
+            match = version_index.get(key)
+            if match is None:
+                unresolved.append(i)
+            else:
+                revert_positions.append(i)
+                reverted_positions.append(match[1])
+
+        # this edit is now the latest one with its version
+        entry = [i, -1]
+        version_index[key] = entry
+        latest_in_title[title] = entry
+
+    return revert_positions, reverted_positions, unresolved
+
+def _resolve_reverts_table(table):
+    """
+    Function matches every revert of an EditTable to the edit it reverted with two sorts 
+    instead of a loop. Gives the same results as resolve_reverts, as arrays.
+    """
+    return _resolve_revert_columns(table.title_codes, table.versions, table.reverts)
+
+def _resolve_revert_columns(titles, versions, reverts):
+    """
+    Function matches the reverts of the title code, version and revert columns of a list 
+    of edits in file order, like _resolve_reverts_table.
+    """
+    positions = np.arange(len(titles))
+
+    # sorted by title, version and position, the next entry of a group is the 
+    # nearest edit further down the file with the same article version
+    order = np.lexsort((positions, versions, titles))
+    same = (titles[order[1:]] == titles[order[:-1]]) & (versions[order[1:]] == versions[order[:-1]])
+    older_same = np.full(len(titles), -1, dtype=np.int64)
+    older_same[order[:-1][same]] = order[1:][same]
+
+    # sorted by title and position, the previous entry of an article is the edit that followed
+    order = np.lexsort((positions, titles))
+    same = titles[order[1:]] == titles[order[:-1]]
+    follower = np.full(len(titles), -1, dtype=np.int64)
+    follower[order[1:][same]] = order[:-1][same]
+
+    # reverts from the bottom of the file to the top, like the loop version
+    reverts = np.flatnonzero(reverts == 1)[::-1]
+    matches = older_same[reverts]
+    found = matches >= 0
+    return reverts[found], follower[matches[found]], reverts[~found]
+
+def create_revert_network(all_edits, user_info_dict, seniority_index=None, compact=False, stats=None):
     """
     Function returns a list of dictionaries containing the 
     reverter, reverted, time stamp, reverter seniority and reverted seniority.
     This is a network of reverts.
     Takes for argument the list of all edits and the dictionary of user_info_dict.
-    Seniority is provided before the revert.
+    Seniority is provided before the revert, and is looked up in seniority_index 
+    (built from user_info_dict when not given).
+    Reverts are matched with resolve_reverts, unresolved reverts are left out.
+    all_edits can also be an EditTable.
+    With compact=True the network is returned as an EdgeStore with integer user ids.
+    stats is an optional PipelineStats that records the stage and counts the reverts 
+    seen, self-reverts, unresolved reverts and seniority lookups.
     """
-    # List to store revert dictionaries
-    network = []
-    # Set to keep track of unique users involved in reverts
-    unique_users = set()
-    # Iterate through all edits in reverse order (since the file is in reverse chronological order)
-    for i in range(len(all_edits) - 1, -1, -1):  
-        # Check if the edit is a revert using column "revert"
-        if all_edits[i][2] == 1:
-            # User that "comits" the revert
+    if isinstance(all_edits, EditTable):
+        return _create_revert_network_table(all_edits, user_info_dict, seniority_index, compact, stats)
+
+    with _stage(stats, "create_revert_network"):
+        # Match every revert to the edit it reverted
+        revert_positions, reverted_positions, unresolved = resolve_reverts(all_edits)
+
+        # List to store the reverter, reverted and time stamp of every revert
+        reverts = []
+        for i, k in zip(revert_positions, reverted_positions):
+            # User that "comits" the revert and user of the reverted edit
             reverter_user = all_edits[i][4]
-            # Time stamp of the revert is column 1
-            time_stamp = all_edits[i][1]
-            # Initialize the found_reverted as False and the index j as 0
-            found_reverted = False
-            j = 0
-
-            # Iterate to find the reverted user
-            while found_reverted is False:
-                j += 1
-                # Check if the version of the next edit is the same as the one where revert == 1
-                if i + j < len(all_edits) and all_edits[i][3] == all_edits[i + j][3]:  
-                    # If the version is the same, then the user of the next edit is the reverted user
-                    reverted_user = all_edits[i + j - 1][4]
-                    # Set found_reverted to True
-                    found_reverted = True
-
-                    # Check that the reverted user is not the same as the reverter user
-                    # We don't accept self-reverts
-                    if (
-                        reverted_user != reverter_user
-                        and all_edits[i][0] == all_edits[i + j][0]
-                    ):
-                        # If the reverted user is not the same as the reverter user then get the seniority of both users
-                        # Call the function get_seniority_before_revert
-                        reverter_seniority = get_seniority_before_revert(reverter_user, time_stamp, user_info_dict)
-                        reverted_seniority = get_seniority_before_revert(reverted_user, time_stamp, user_info_dict)
-
-                        # Add the reverted and reverter to the unique users set to keep track of all users involved in reverts
-                        # Add the reverter, reverted, time stamp, reverter seniority and reverted seniority to the network
-                        unique_users.add(reverter_user)
-                        unique_users.add(reverted_user)
-                        network.append(
-                            {
-                                "Reverter": reverter_user,
-                                "Reverted": reverted_user,
-                                "Time stamp": time_stamp,
-                                "Reverter Seniority": reverter_seniority,
-                                "Reverted Seniority": reverted_seniority,
-                            }
-                        )
-    return unique_users, network
+            reverted_user = all_edits[k][4]
+
+            # Check that the reverted user is not the same as the reverter user
+            # We don't accept self-reverts
+            if reverted_user != reverter_user:
+                # The seniorities of both users are looked up for all reverts at once below
+                # Time stamp of the revert is column 1
+                reverts.append((reverter_user, reverted_user, all_edits[i][1]))
+
+        result = _network_from_reverts(reverts, user_info_dict, seniority_index, compact)
 
+    if stats is not None:
+        _count_reverts(stats, len(revert_positions), len(unresolved), len(reverts))
+    return result
 
-def count_and_label_AB_BA(network):
+def _count_reverts(stats, resolved, unresolved, kept):
+    """
+    Function adds the counters of one network build to stats: kept is the number of 
+    resolved reverts that are not self-reverts, and each of them needs two seniorities.
+    """
+    stats.add("reverts_seen", resolved + unresolved)
+    stats.add("unresolved_reverts", unresolved)
+    stats.add("self_reverts", resolved - kept)
+    stats.add("seniority_lookups", 2 * kept)
+
+
+def _edit_columns(all_edits):
+    """
+    Function returns the title code, revert, version and user code columns of a list of edits 
+    as NumPy arrays, with the list of users. The timestamps are left out: converting datetime 
+    objects to datetime64 costs more than resolving the reverts, and only the reverts need them.
+    """
+    count = len(all_edits)
+    title_index = {}
+    user_index = {}
+    title_codes = np.fromiter((title_index.setdefault(edit[0], len(title_index)) for edit in all_edits), dtype=np.int32, count=count)
+    reverts = np.fromiter((edit[2] for edit in all_edits), dtype=np.int8, count=count)
+    versions = np.fromiter((edit[3] for edit in all_edits), dtype=np.int64, count=count)
+    user_codes = np.fromiter((user_index.setdefault(edit[4], len(user_index)) for edit in all_edits), dtype=np.int32, count=count)
+    return title_codes, reverts, versions, user_codes, list(user_index)
+
+def _resolve_shard(shard):
+    """
+    Function resolves the reverts of one shard of articles in a worker process of 
+    create_revert_network_parallel. Takes the title code, version and revert columns of the shard 
+    and returns the shard positions of the reverts, of the reverted edits, and the number of unresolved reverts.
+    """
+    revert_positions, reverted_positions, unresolved = _resolve_revert_columns(*shard)
+    return revert_positions, reverted_positions, len(unresolved)
+
+def create_revert_network_parallel(all_edits, user_info_dict, processes=None, shards=None, seniority_index=None,
+                                   compact=False, stats=None):
+    """
+    Function returns the same unique users and network as create_revert_network, 
+    with the reverts resolved by a pool of processes.
+    A revert only links edits of the same article, so the edits are split by title into 
+    shards (4 per process by default) and every shard is resolved in a worker. A list of edits 
+    is first turned into NumPy columns, so the workers receive array slices instead of pickled rows 
+    and send back arrays of positions. The edges are then built in the order of the serial build.
+    all_edits can also be an EditTable. compact and stats work as in create_revert_network.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if shards is None:
+        shards = 4 * processes
+
+    with _stage(stats, "create_revert_network"):
+        if isinstance(all_edits, EditTable):
+            title_codes, reverts, versions, user_codes, users = (
+                all_edits.title_codes, all_edits.reverts, all_edits.versions, all_edits.user_codes, all_edits.users
+            )
+        else:
+            title_codes, reverts, versions, user_codes, users = _edit_columns(all_edits)
+
+        # give every title a shard, in turn by order of first appearance
+        shard_of_edit = title_codes % shards
+        order = np.argsort(shard_of_edit, kind='stable')
+        shard_positions = [positions for positions in np.split(order, np.cumsum(np.bincount(shard_of_edit, minlength=shards))[:-1]) if len(positions)]
+        jobs = [(title_codes[positions], versions[positions], reverts[positions]) for positions in shard_positions]
+
+        with multiprocessing.Pool(processes) as pool:
+            results = pool.map(_resolve_shard, jobs)
+
+        # back to positions in the full edit list, from the bottom of the file to the top like the serial build
+        revert_positions = np.concatenate([np.array([], dtype=np.int64)] + [positions[result[0]] for positions, result in zip(shard_positions, results)])
+        reverted_positions = np.concatenate([np.array([], dtype=np.int64)] + [positions[result[1]] for positions, result in zip(shard_positions, results)])
+        order = np.argsort(-revert_positions, kind='stable')
+        revert_positions, reverted_positions = revert_positions[order], reverted_positions[order]
+        unresolved = sum(result[2] for result in results)
+
+        # we don't accept self-reverts
+        keep = user_codes[revert_positions] != user_codes[reverted_positions]
+        revert_positions, reverted_positions = revert_positions[keep], reverted_positions[keep]
+        if isinstance(all_edits, EditTable):
+            times = all_edits.timestamps[revert_positions].tolist()
+        else:
+            times = [all_edits[i][1] for i in revert_positions.tolist()]
+        reverts_kept = [
+            (users[reverter_code], users[reverted_code], time_stamp)
+            for reverter_code, reverted_code, time_stamp
+            in zip(user_codes[revert_positions].tolist(), user_codes[reverted_positions].tolist(), times)
+        ]
+        result = _network_from_reverts(reverts_kept, user_info_dict, seniority_index, compact)
+
+    if stats is not None:
+        _count_reverts(stats, len(keep), unresolved, len(reverts_kept))
+    return result
+
+
+def _create_revert_network_table(table, user_info_dict, seniority_index=None, compact=False, stats=None):
+    """
+    Function returns the unique users and the network of reverts of an EditTable,
+    using the vectorized resolver and dropping self-reverts in one pass.
+    """
+    with _stage(stats, "create_revert_network"):
+        revert_positions, reverted_positions, unresolved = resolve_reverts(table)
+
+        # we don't accept self-reverts
+        reverter_codes = table.user_codes[revert_positions]
+        reverted_codes = table.user_codes[reverted_positions]
+        keep = reverter_codes != reverted_codes
+
+        reverts = [
+            (table.users[reverter_code], table.users[reverted_code], table.timestamps[position].item())
+            for position, reverter_code, reverted_code in zip(revert_positions[keep], reverter_codes[keep], reverted_codes[keep])
+        ]
+        result = _network_from_reverts(reverts, user_info_dict, seniority_index, compact)
+
+    if stats is not None:
+        _count_reverts(stats, len(revert_positions), len(unresolved), len(reverts))
+    return result
+
+
+class ABBADetector:
+    """
+    Streaming detector of AB-BA event sequences, fed one revert at a time in time order.
+    State is kept per unordered user pair: for each direction, a deque of the recent 
+    reverts that no response has matched yet and the time of the latest revert.
+    Every revert enters and leaves a deque once, so a sorted network is processed in linear time.
+    labels[k] is 1 when the k-th pushed revert is part of an AB-BA sequence.
+    """
+    def __init__(self, window=timedelta(hours=24)):
+        self.window = window
+        self.count = 0
+        self.labels = bytearray()
+        # (smaller user, larger user) -> [pending deque, pending deque, latest time, latest time],
+        # with slot 0 for reverts from the smaller user and slot 1 for the other direction
+        self._pairs = {}
+
+    def push(self, reverter, reverted, time):
+        """
+        Adds one revert, which must not be older than the reverts pushed before it.
+        Returns the index of the revert in labels.
+        """
+        index = len(self.labels)
+        self.labels.append(0)
+
+        if reverter < reverted:
+            key, side = (reverter, reverted), 0
+        else:
+            key, side = (reverted, reverter), 1
+        state = self._pairs.get(key)
+        if state is None:
+            state = self._pairs[key] = [deque(), deque(), None, None]
+
+        # the revert is a response if the other user reverted this one within the window
+        other = 1 - side
+        latest = state[2 + other]
+        if latest is not None and time - latest <= self.window:
+            self.labels[index] = 1
+            # every unmatched revert the other way within the window starts a sequence
+            pending = state[other]
+            while pending:
+                start_time, start_index = pending.popleft()
+                if time - start_time <= self.window:
+                    self.count += 1
+                    self.labels[start_index] = 1
+
+        # reverts this way that are out of the window can no longer be answered
+        pending = state[side]
+        while pending and time - pending[0][0] > self.window:
+            pending.popleft()
+        pending.append((time, index))
+        state[2 + side] = time
+        return index
+
+    def comparisons(self):
+        """
+        Function returns the number of time comparisons made so far: every revert is compared 
+        with the latest revert the other way, and every pending revert with one later revert 
+        when it leaves its deque. Worked out from the deques so that push does not have to count.
+        """
+        pending = sum(len(state[0]) + len(state[1]) for state in self._pairs.values())
+        return 2 * len(self.labels) - pending
+
+def count_and_label_AB_BA(network, window=timedelta(hours=24), stats=None):
     """
     Function that counts the number of AB-BA event sequences in the network. 
     Takes a list of dictionaries as input and adds the 'AB-BA' key to edges, indicating 
     whether they are involved in an AB-BA sequence or not.
     Edges can be considered a "response" for multiple sequences, but not as a start node. 
+    A response has to happen within window (24 hours by default) of the start.
+    network can also be an EdgeStore, which is returned sorted with its ab_ba column set.
+    stats is an optional PipelineStats that records the stage and the comparisons of the scan.
+    """
+    with _stage(stats, "count_and_label_AB_BA"):
+        if isinstance(network, EdgeStore):
+            detector, network_sorted = _label_AB_BA_store(network, window)
+        else:
+            detector, network_sorted = _label_AB_BA_list(network, window)
+    if stats is not None:
+        stats.add("ab_ba_comparisons", detector.comparisons())
+    return detector.count, network_sorted
+
+def _label_AB_BA_list(network, window):
+    """
+    Function labels the AB-BA sequences of a list of dictionaries and returns the detector
+    and the sorted network.
     """
     # Sorting the network by time stamp
     # so that the first revert is always the first revert in the network
@@ -169,41 +1227,299 @@ def count_and_label_AB_BA(network):
     network_sorted = network.copy()
     network_sorted.sort(key=lambda x: x['Time stamp'])
 
-    # Starting the counter
-    ab_ba_sequences = 0
-
-    # Initialize a set to keep track of edges involved in AB-BA sequences
-    ab_ba_edges = set()
-
-    # Iterate through the network 
-    for i in range(len(network_sorted)):
-        # Flag to track if the current i edge is part of any AB-BA sequence
-        found_ab_ba = False
-        
-        for j in range(i + 1, len(network_sorted)):
-            # If time diff > 24 hours, then not AB-BA sequence
-            # break loop if time diff > 24 hours
-            if network_sorted[j]['Time stamp'] - network_sorted[i]['Time stamp'] > timedelta(hours=24):
-                break
-            # Check if the reverter of i is the reverted of j and the other way around
-            if network_sorted[i]['Reverter'] == network_sorted[j]['Reverted'] and network_sorted[i]['Reverted'] == network_sorted[j]['Reverter']:
-                # If this is the first occurrence for the current i edge, increment the counter
-                if not found_ab_ba:
-                    ab_ba_sequences += 1
-                    found_ab_ba = True
-
-                # Add only the current i and j edges to the set of AB-BA edges
-                ab_ba_edges.add((network_sorted[i]['Reverter'], network_sorted[i]['Reverted'], network_sorted[i]['Time stamp']))
-                ab_ba_edges.add((network_sorted[j]['Reverter'], network_sorted[j]['Reverted'], network_sorted[j]['Time stamp']))
+    # Feed the edges to the detector in time order
+    detector = ABBADetector(window)
+    for edge in network_sorted:
+        detector.push(edge['Reverter'], edge['Reverted'], edge['Time stamp'])
 
     # Update 'AB-BA' key for the edges directly involved in AB-BA sequences
+    for edge, label in zip(network_sorted, detector.labels):
+        edge['AB-BA'] = label == 1
+
+    return detector, network_sorted
+
+def _label_AB_BA_store(store, window):
+    """
+    Function labels the AB-BA sequences of an EdgeStore, comparing integer user ids 
+    and times in seconds, and returns the detector and the sorted store.
+    """
+    store_sorted = store.sorted_by_time()
+    detector = ABBADetector(int(window.total_seconds()))
+    for reverter, reverted, time in zip(store_sorted.reverters.tolist(), store_sorted.reverteds.tolist(), _to_seconds(store_sorted.times).tolist()):
+        detector.push(reverter, reverted, time)
+    store_sorted.ab_ba = np.frombuffer(bytes(detector.labels), dtype=np.uint8).astype(bool)
+    return detector, store_sorted
+
+# Temporal motifs of reverts that MotifCounter can count. For edges in time order within one window:
+# AB-BA: B reverts A back, AB-AB: A reverts B again, AB-BC: B goes on to revert a third user C,
+# AB-CA: a third user C reverts A, AB-BC-CA: A reverts B, B reverts C and C reverts A
+MOTIFS = ('AB-BA', 'AB-AB', 'AB-BC', 'AB-CA', 'AB-BC-CA')
+
+class _PairReverts:
+    """
+    Reverts from one user to another within the window of a MotifCounter, in time order.
+    times and indices are parallel lists whose entries before head are out of the window, 
+    and marks holds, per role, the (first, last) indices of a run of reverts already labelled for it.
+    """
+    __slots__ = ('times', 'indices', 'head', 'marks')
+
+    def __init__(self):
+        self.times = []
+        self.indices = []
+        self.head = 0
+        self.marks = {}
+
+    def first_recent(self, since):
+        """
+        Returns the position of the first revert not older than since, dropping the older ones 
+        from the lists once they are more than half of them.
+        """
+        head = bisect.bisect_left(self.times, since, self.head)
+        if head > 64 and 2 * head > len(self.times):
+            del self.times[:head]
+            del self.indices[:head]
+            head = 0
+        self.head = head
+        return head
+
+    def unlabelled(self, role, first, end):
+        """
+        Returns the indices of the reverts at positions first to end - 1 that were not labelled 
+        for role yet, and records them as labelled.
+        """
+        if first >= end:
+            return []
+        indices = self.indices
+        mark = self.marks.get(role)
+        if mark is not None:
+            # positions low to high - 1 are labelled, so only the rest of the run is new
+            low = bisect.bisect_left(indices, mark[0])
+            high = bisect.bisect_right(indices, mark[1])
+            if first <= high and low <= end:
+                self.marks[role] = (indices[min(first, low)], indices[max(end, high) - 1])
+                return indices[first:low] + indices[max(first, high):end]
+        self.marks[role] = (indices[first], indices[end - 1])
+        return indices[first:end]
+
+class MotifCounter:
+    """
+    Streaming counter of temporal motifs of reverts, fed one revert at a time in time order.
+    Keeps the reverts within the last window per (reverter, reverted) pair, and per user the 
+    latest time they reverted or were reverted by each other user, so a new revert only looks up 
+    the pairs a motif can complete instead of rescanning the recent reverts of its two users.
+    A motif is counted once per starting revert that has at least one completion within the 
+    window, like AB-BA sequences, and labels[motif][k] is 1 for every revert k involved in it.
+    """
+    def __init__(self, motifs=MOTIFS, window=timedelta(hours=24)):
+        unknown = set(motifs) - set(MOTIFS)
+        if unknown:
+            raise ValueError(f"Unknown motifs: {sorted(unknown)}")
+        self.motifs = tuple(motifs)
+        self.window = window
+        self.pushed = 0
+        self.counts = {motif: 0 for motif in self.motifs}
+        self.labels = {motif: bytearray() for motif in self.motifs}
+        # flags of the starting reverts that were already counted, per motif
+        self._counted = {motif: bytearray() for motif in self.motifs}
+        # (reverter, reverted) -> _PairReverts
+        self._pairs = {}
+        # user -> {reverted user: latest time} and user -> {reverter: latest time}
+        self._targets = {}
+        self._reverters = {}
+        # user -> [time, user, time, user] of the latest two distinct users they reverted, 
+        # and of the latest two distinct users who reverted them
+        self._latest_targets = {}
+        self._latest_reverters = {}
+        # for AB-BC and AB-CA, user -> set of the other users of the pairs with reverts not labelled yet
+        self._pending = {motif: {} for motif in ('AB-BC', 'AB-CA') if motif in self.motifs}
+        self._last_sweep = None
+
+    def _label_starts(self, motif, starts):
+        """
+        Labels the starting reverts of a motif and counts the ones not counted before.
+        """
+        labels = self.labels[motif]
+        counted = self._counted[motif]
+        for start in starts:
+            labels[start] = 1
+            if not counted[start]:
+                counted[start] = 1
+                self.counts[motif] += 1
+
+    def _match_pair(self, motif, key, since):
+        """
+        Labels the recent reverts of pair key as starts of motif. Returns whether there is one.
+        """
+        pair = self._pairs.get(key)
+        if pair is None or pair.times[-1] < since:
+            return False
+        self._label_starts(motif, pair.unlabelled(motif, pair.first_recent(since), len(pair.indices)))
+        return True
+
+    def _match_others(self, motif, latest, user, excluded, since, made):
+        """
+        Labels the recent reverts between user and anyone but excluded as starts of motif: 
+        the reverts user made when made is True, else the ones user received. 
+        Returns whether there is one.
+        """
+        recent = latest.get(user)
+        if recent is None:
+            return False
+        time, other = recent[0], recent[1]
+        if other == excluded:
+            time, other = recent[2], recent[3]
+        if other is None or time < since:
+            return False
+        # pairs whose reverts were all labelled by an earlier match are no longer pending
+        pending = self._pending[motif].get(user, set())
+        for partner in [partner for partner in pending if partner != excluded]:
+            pending.discard(partner)
+            pair = self._pairs.get((user, partner) if made else (partner, user))
+            if pair is not None:
+                self._label_starts(motif, pair.unlabelled(motif, pair.first_recent(since), len(pair.indices)))
+        return True
+
+    def _match_triangles(self, motif, reverter, reverted, since):
+        """
+        Labels the AB-BC-CA motifs closed by reverter (C) reverting reverted (A): for every user B 
+        that A reverted and that reverted C, the recent reverts A -> B followed by a revert B -> C. 
+        Returns whether there is one.
+        """
+        targets = self._targets.get(reverted)
+        reverters = self._reverters.get(reverter)
+        if not targets or not reverters:
+            return False
+        found = False
+        for b_user in (targets if len(targets) <= len(reverters) else reverters):
+            if b_user not in targets or b_user not in reverters or targets[b_user] < since:
+                continue
+            starts = self._pairs.get((reverted, b_user))
+            middles = self._pairs.get((b_user, reverter))
+            if starts is None or middles is None:
+                continue
+            first = starts.first_recent(since)
+            # the middles that come after the first recent start, and the starts before the last middle
+            after = bisect.bisect_right(middles.indices, starts.indices[first], middles.head)
+            if after == len(middles.indices):
+                continue
+            end = bisect.bisect_left(starts.indices, middles.indices[-1], first)
+            self._label_starts(motif, starts.unlabelled(motif, first, end))
+            labels = self.labels[motif]
+            for middle in middles.unlabelled(motif + ' middle', after, len(middles.indices)):
+                labels[middle] = 1
+            found = True
+        return found
+
+    def _sweep(self, since):
+        """
+        Drops the pairs and users whose reverts are all out of the window, to keep the state bounded.
+        """
+        self._pairs = {key: pair for key, pair in self._pairs.items() if pair.times[-1] >= since}
+        for by_user in (self._targets, self._reverters):
+            for user in list(by_user):
+                recent = {other: time for other, time in by_user[user].items() if time >= since}
+                if recent:
+                    by_user[user] = recent
+                else:
+                    del by_user[user]
+        for latest in (self._latest_targets, self._latest_reverters):
+            for user in [user for user, recent in latest.items() if recent[0] < since]:
+                del latest[user]
+        for motif, by_user in self._pending.items():
+            made = motif == 'AB-CA'
+            for user in list(by_user):
+                by_user[user] = {
+                    other for other in by_user[user]
+                    if ((user, other) if made else (other, user)) in self._pairs
+                }
+                if not by_user[user]:
+                    del by_user[user]
+
+    def push(self, reverter, reverted, time):
+        """
+        Adds one revert, which must not be older than the reverts pushed before it.
+        Returns the index of the revert in the labels.
+        """
+        index = self.pushed
+        self.pushed += 1
+        for motif in self.motifs:
+            self.labels[motif].append(0)
+            self._counted[motif].append(0)
+
+        since = time - self.window
+        if self._last_sweep is None:
+            self._last_sweep = time
+        elif time - self._last_sweep > self.window:
+            self._sweep(since)
+            self._last_sweep = time
+
+        for motif in self.motifs:
+            if motif == 'AB-BA':
+                # the reverted user reverted this reverter before
+                matched = self._match_pair(motif, (reverted, reverter), since)
+            elif motif == 'AB-AB':
+                # this reverter reverted the same user before
+                matched = self._match_pair(motif, (reverter, reverted), since)
+            elif motif == 'AB-BC':
+                # this reverter was reverted by someone else before
+                matched = self._match_others(motif, self._latest_reverters, reverter, reverted, since, made=False)
+            elif motif == 'AB-CA':
+                # the reverted user reverted someone else before
+                matched = self._match_others(motif, self._latest_targets, reverted, reverter, since, made=True)
+            else:
+                # A (the reverted user) reverted B, then B reverted C (this reverter)
+                matched = self._match_triangles(motif, reverter, reverted, since)
+            if matched:
+                self.labels[motif][index] = 1
+
+        pair = self._pairs.get((reverter, reverted))
+        if pair is None:
+            pair = self._pairs[(reverter, reverted)] = _PairReverts()
+        else:
+            pair.first_recent(since)
+        pair.times.append(time)
+        pair.indices.append(index)
+        self._targets.setdefault(reverter, {})[reverted] = time
+        self._reverters.setdefault(reverted, {})[reverter] = time
+        for latest, user, other in ((self._latest_targets, reverter, reverted), (self._latest_reverters, reverted, reverter)):
+            recent = latest.get(user)
+            if recent is None:
+                latest[user] = [time, other, None, None]
+            elif recent[1] == other:
+                recent[0] = time
+            else:
+                latest[user] = [time, other, recent[0], recent[1]]
+        if 'AB-BC' in self._pending:
+            self._pending['AB-BC'].setdefault(reverted, set()).add(reverter)
+        if 'AB-CA' in self._pending:
+            self._pending['AB-CA'].setdefault(reverter, set()).add(reverted)
+        return index
+
+def count_and_label_motifs(network, motifs=MOTIFS, window=timedelta(hours=24)):
+    """
+    Function counts the temporal motifs in the network in one time ordered pass.
+    Takes a list of dictionaries and returns a dictionary of counts per motif and the 
+    network sorted by time stamp, where every edge has a key per motif indicating whether 
+    it is involved in that motif, like the 'AB-BA' key of count_and_label_AB_BA.
+    """
+    network_sorted = network.copy()
+    network_sorted.sort(key=lambda x: x['Time stamp'])
+
+    counter = MotifCounter(motifs, window)
     for edge in network_sorted:
-        edge_tuple = (edge['Reverter'], edge['Reverted'], edge['Time stamp'])
-        edge['AB-BA'] = edge_tuple in ab_ba_edges
+        counter.push(edge['Reverter'], edge['Reverted'], edge['Time stamp'])
+
+    for motif in counter.motifs:
+        for edge, label in zip(network_sorted, counter.labels[motif]):
+            edge[motif] = label == 1
+
+    return counter.counts, network_sorted
 
-    return ab_ba_sequences, network_sorted
+def get_seniority_diffs(network_sorted, stats=None):
+    if stats is not None:
+        with stats.stage("get_seniority_diffs"):
+            return get_seniority_diffs(network_sorted)
 
-def get_seniority_diffs(network_sorted):
     # Initialize lists to store the absolute differences in seniority
     ab_ba_diffs = []
     other_diffs = []
@@ -219,4 +1535,257 @@ def get_seniority_diffs(network_sorted):
         else:
             other_diffs.append(diff)
     
-    return ab_ba_diffs, other_diffs
\ No newline at end of file
+    return ab_ba_diffs, other_diffs
+
+def _seniority_columns(network_sorted):
+    """
+    Function returns the reverter seniorities, reverted seniorities and AB-BA labels 
+    of a network (a list of dictionaries or an EdgeStore) as arrays.
+    Edges without an 'AB-BA' key count as other reverts.
+    """
+    if isinstance(network_sorted, EdgeStore):
+        labels = network_sorted.ab_ba
+        if labels is None:
+            labels = np.zeros(len(network_sorted), dtype=bool)
+        return network_sorted.reverter_seniorities, network_sorted.reverted_seniorities, labels
+
+    count = len(network_sorted)
+    reverter_seniorities = np.fromiter((edge['Reverter Seniority'] for edge in network_sorted), dtype=np.float64, count=count)
+    reverted_seniorities = np.fromiter((edge['Reverted Seniority'] for edge in network_sorted), dtype=np.float64, count=count)
+    labels = np.fromiter((edge.get('AB-BA', False) for edge in network_sorted), dtype=bool, count=count)
+    return reverter_seniorities, reverted_seniorities, labels
+
+def seniority_diff_arrays(network_sorted):
+    """
+    Function returns two arrays with the absolute differences in seniority of the reverts 
+    in AB-BA sequences and of all other reverts, computed in one vectorized pass.
+    Takes a labelled network (a list of dictionaries or an EdgeStore). Unlike get_seniority_diffs, 
+    edges without an 'AB-BA' label count as other reverts.
+    """
+    reverter_seniorities, reverted_seniorities, labels = _seniority_columns(network_sorted)
+    diffs = np.abs(reverter_seniorities - reverted_seniorities)
+    return diffs[labels], diffs[~labels]
+
+class SeniorityDiffSummary:
+    """
+    Streaming summary of the absolute differences in seniority for the 'AB-BA' and 'other' groups.
+    Keeps a fixed-bin histogram, the count, sum, minimum and maximum of every group, so any 
+    number of network chunks can be summarized in constant memory. Values outside value_range 
+    are counted in the first or last bin.
+    Means are exact; quantiles are interpolated within the histogram bins.
+    """
+    groups = ('AB-BA', 'other')
+
+    def __init__(self, bins=30, value_range=(0.0, 8.0)):
+        self.bin_edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        self.counts = {group: np.zeros(bins, dtype=np.int64) for group in self.groups}
+        self.totals = {group: 0 for group in self.groups}
+        self.sums = {group: 0.0 for group in self.groups}
+        self.minimums = {group: np.inf for group in self.groups}
+        self.maximums = {group: -np.inf for group in self.groups}
+
+    def add(self, group, diffs):
+        """
+        Adds an array of differences to one group.
+        """
+        diffs = np.asarray(diffs, dtype=np.float64)
+        if len(diffs) == 0:
+            return
+        low, high = self.bin_edges[0], self.bin_edges[-1]
+        bins = len(self.bin_edges) - 1
+        # bin index straight from the value, which is faster than searching the edges
+        index = np.clip(((diffs - low) * (bins / (high - low))).astype(np.int64), 0, bins - 1)
+        self.counts[group] += np.bincount(index, minlength=bins)
+        self.totals[group] += len(diffs)
+        self.sums[group] += float(diffs.sum())
+        self.minimums[group] = min(self.minimums[group], float(diffs.min()))
+        self.maximums[group] = max(self.maximums[group], float(diffs.max()))
+
+    def update(self, network_sorted):
+        """
+        Adds a chunk of a labelled network (a list of dictionaries or an EdgeStore).
+        """
+        ab_ba_diffs, other_diffs = seniority_diff_arrays(network_sorted)
+        self.add('AB-BA', ab_ba_diffs)
+        self.add('other', other_diffs)
+
+    def merge(self, other):
+        """
+        Adds the counts of another summary with the same bins.
+        """
+        if not np.array_equal(self.bin_edges, other.bin_edges):
+            raise ValueError("Summaries must have the same bins to be merged")
+        for group in self.groups:
+            self.counts[group] += other.counts[group]
+            self.totals[group] += other.totals[group]
+            self.sums[group] += other.sums[group]
+            self.minimums[group] = min(self.minimums[group], other.minimums[group])
+            self.maximums[group] = max(self.maximums[group], other.maximums[group])
+
+    def mean(self, group):
+        """
+        Returns the mean difference of a group, NaN if it is empty.
+        """
+        if self.totals[group] == 0:
+            return float('nan')
+        return self.sums[group] / self.totals[group]
+
+    def quantile(self, group, q):
+        """
+        Returns the q-th quantile (0 <= q <= 1) of a group, interpolated within the histogram bins 
+        and kept between the observed minimum and maximum. NaN if the group is empty.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        total = self.totals[group]
+        if total == 0:
+            return float('nan')
+        # the extremes are known exactly
+        if q == 0:
+            return self.minimums[group]
+        if q == 1:
+            return self.maximums[group]
+        cumulative = np.cumsum(self.counts[group])
+        target = q * total
+        # first bin that reaches the target rank, then the position of the rank within it
+        k = min(int(np.searchsorted(cumulative, target, side='left')), len(cumulative) - 1)
+        before = cumulative[k - 1] if k > 0 else 0
+        fraction = (target - before) / self.counts[group][k] if self.counts[group][k] else 0.0
+        value = self.bin_edges[k] + fraction * (self.bin_edges[k + 1] - self.bin_edges[k])
+        return float(min(max(value, self.minimums[group]), self.maximums[group]))
+
+    def histogram(self, group):
+        """
+        Returns the counts and bin edges of a group, as np.histogram does 
+        (they can be plotted with matplotlib's stairs).
+        """
+        return self.counts[group].copy(), self.bin_edges.copy()
+
+
+class RevertNetworkState:
+    """
+    Persistent, resumable state of the revert pipeline for daily delta files.
+    Keeps the edit counts and sorted time stamps of every user, the (title, version) index 
+    of every article version with the user who edited after it, the network, and the AB-BA 
+    detector with its open windows.
+    Updating with a delta costs time proportional to the delta, not to the full history, 
+    as long as every delta only holds edits newer than the ones already added.
+    """
+    def __init__(self, window=timedelta(hours=24)):
+        self.edit_counts = {}
+        # user -> sorted list of the time stamps of the user's edits
+        self.user_info_dict = {}
+        # (title, version) -> [user of the latest edit with this version, user of the edit that followed it]
+        self.version_index = {}
+        # title -> index entry of the latest edit of the article
+        self.latest_in_title = {}
+        self.unique_users = set()
+        self.network = []
+        self.network_sorted = []
+        self.unresolved_reverts = 0
+        self.detector = ABBADetector(window)
+
+    @property
+    def ab_ba_sequences(self):
+        return self.detector.count
+
+    def update(self, edits):
+        """
+        Function adds a list of edits in the order of the dump (newest first) 
+        and returns the new edges of the network.
+        """
+        # Add the time stamps first, so that a revert counts every earlier edit of the delta
+        for _, time, _, _, user in edits:
+            if user not in self.edit_counts:
+                self.edit_counts[user] = 0
+                self.user_info_dict[user] = []
+            self.edit_counts[user] += 1
+            times = self.user_info_dict[user]
+            if times and times[-1] > time:
+                bisect.insort(times, time)
+            else:
+                times.append(time)
+
+        # Resolve the reverts from the oldest edit to the newest, like resolve_reverts
+        new_edges = []
+        for title, time, revert, version, user in reversed(edits):
+            key = (title, version)
+            previous = self.latest_in_title.get(title)
+            if previous is not None:
+                previous[1] = user
+
+            if revert == 1:
+                match = self.version_index.get(key)
+                if match is None:
+                    self.unresolved_reverts += 1
+                elif match[1] != user:
+                    new_edges.append(
+                        {
+                            "Reverter": user,
+                            "Reverted": match[1],
+                            "Time stamp": time,
+                            "Reverter Seniority": self._seniority(user, time),
+                            "Reverted Seniority": self._seniority(match[1], time),
+                        }
+                    )
+                    self.unique_users.add(user)
+                    self.unique_users.add(match[1])
+
+            entry = [user, None]
+            self.version_index[key] = entry
+            self.latest_in_title[title] = entry
+
+        self.network.extend(new_edges)
+        self._label_AB_BA(new_edges)
+        return new_edges
+
+    def update_from_file(self, file_path, skipped_lines=1):
+        """
+        Function reads a delta file with read_data and adds its edits.
+        Returns the new edges of the network.
+        """
+        return self.update(read_data(file_path, skipped_lines))
+
+    def _seniority(self, user, revert_time):
+        """
+        Function returns the seniority of a user before revert_time, 
+        with the same rule as get_seniority_before_revert.
+        """
+        edit_count = bisect.bisect_left(self.user_info_dict[user], revert_time)
+        return np.log10(edit_count) if edit_count else 0
+
+    def _label_AB_BA(self, new_edges):
+        """
+        Function feeds the new edges to the AB-BA detector in time order and 
+        updates the labels of the edges whose window is still open.
+        """
+        if not new_edges:
+            return
+        new_edges = sorted(new_edges, key=lambda x: x['Time stamp'])
+        first = len(self.network_sorted)
+        for edge in new_edges:
+            self.detector.push(edge['Reverter'], edge['Reverted'], edge['Time stamp'])
+        self.network_sorted.extend(new_edges)
+
+        # only edges within one window of the first new edge can have gained a label
+        oldest_open = new_edges[0]['Time stamp'] - self.detector.window
+        k = first - 1
+        while k >= 0 and self.network_sorted[k]['Time stamp'] >= oldest_open:
+            k -= 1
+        for k in range(k + 1, len(self.network_sorted)):
+            self.network_sorted[k]['AB-BA'] = self.detector.labels[k] == 1
+
+    def save(self, file_path):
+        """
+        Function saves the state to a file with pickle.
+        """
+        with open(file_path, 'wb') as file:
+            pickle.dump(self, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        Function loads a state saved with save.
+        """
+        with open(file_path, 'rb') as file:
+            return pickle.load(file)
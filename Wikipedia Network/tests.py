@@ -0,0 +1,762 @@
+import bz2
+import gzip
+import lzma
+import math
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+import benchmark_reverts
+import revert_graph
+import reverts_network as rn
+
+# A small dump in the same layout as rowiki_2006.txt: one header line, then one edit per line
+# (title, timestamp, revert, version, user), each article in reverse chronological order
+SAMPLE_DUMP = (
+    "title\ttime\trevert\tversion\tuser\n"
+    "Bucuresti\t2006-01-02 10:00:00\t1\t1\tcarol\n"
+    "Bucuresti\t2006-01-02 09:00:00\t0\t3\tbob\n"
+    "Bucuresti\t2006-01-01 12:00:00\t1\t1\talice\n"
+    "Bucuresti\t2006-01-01 11:00:00\t0\t2\tbob\n"
+    "Bucuresti\t2006-01-01 10:00:00\t0\t1\talice\n"
+    "Cluj\t2006-01-01 13:00:00\t1\t1\tbob\n"
+    "Cluj\t2006-01-01 12:30:00\t0\t2\talice\n"
+    "Cluj\t2006-01-01 08:00:00\t0\t1\tcarol\n"
+)
+
+
+def write_sample_dump():
+    """
+    Write the sample dump to a temporary file and return its path.
+    """
+    handle, file_path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(handle, "w", encoding="utf-8") as file:
+        file.write(SAMPLE_DUMP)
+    return file_path
+
+
+class TestReadData(unittest.TestCase):
+    def setUp(self):
+        self.file_path = write_sample_dump()
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_read_data_rows(self):
+        """
+        Test that every line after the header becomes one edit.
+        """
+        all_edits = rn.read_data(self.file_path)
+        self.assertEqual(len(all_edits), 8, "The sample dump has 8 edits")
+        self.assertEqual(all_edits[0], ["Bucuresti", datetime(2006, 1, 2, 10), 1, 1, "carol"])
+
+    def test_read_data_chunks(self):
+        """
+        Test that the chunks add up to the same edits as read_data.
+        """
+        chunks = list(rn.read_data_chunks(self.file_path, chunk_size=3))
+        self.assertEqual([len(chunk) for chunk in chunks], [3, 3, 2])
+        self.assertEqual([edit for chunk in chunks for edit in chunk], rn.read_data(self.file_path))
+
+    def test_read_data_chunks_invalid_size(self):
+        """
+        Test that a ValueError is raised for a chunk size smaller than 1.
+        """
+        with self.assertRaises(ValueError):
+            list(rn.read_data_chunks(self.file_path, chunk_size=0))
+
+    def test_read_compressed_dump(self):
+        """
+        Test that .gz, .bz2 and .xz dumps are read like the plain text file.
+        """
+        expected = rn.read_data(self.file_path)
+        for opener, suffix in [(gzip.open, ".gz"), (bz2.open, ".bz2"), (lzma.open, ".xz")]:
+            compressed_path = self.file_path + suffix
+            with opener(compressed_path, "wt", encoding="utf-8") as file:
+                file.write(SAMPLE_DUMP)
+            self.assertEqual(rn.read_data(compressed_path), expected)
+            os.remove(compressed_path)
+
+    def test_read_dumps(self):
+        """
+        Test that several dumps are merged into one reverse chronological edit stream.
+        """
+        header, *lines = SAMPLE_DUMP.splitlines(keepends=True)
+        directory = tempfile.mkdtemp()
+        # the Bucuresti edits go to a gzip file and the Cluj edits to a plain one
+        with gzip.open(os.path.join(directory, "part1.txt.gz"), "wt", encoding="utf-8") as file:
+            file.writelines([header] + lines[:5])
+        with open(os.path.join(directory, "part2.txt"), "w", encoding="utf-8") as file:
+            file.writelines([header] + lines[5:])
+
+        all_edits = rn.read_dumps(os.path.join(directory, "part*"), processes=2)
+        table = rn.read_dumps(os.path.join(directory, "part*"), processes=2, table=True)
+        shutil.rmtree(directory)
+        expected = sorted(rn.read_data(self.file_path), key=lambda edit: edit[1], reverse=True)
+        self.assertEqual(all_edits, expected)
+        self.assertIsInstance(table, rn.EditTable)
+        self.assertEqual(table.to_list(), expected)
+
+    def test_read_dumps_no_match(self):
+        """
+        Test that a FileNotFoundError is raised when no file matches the pattern.
+        """
+        with self.assertRaises(FileNotFoundError):
+            rn.read_dumps(os.path.join(tempfile.gettempdir(), "no-such-dump-*.gz"))
+
+    def test_parse_timestamp(self):
+        """
+        Test that the fast parser agrees with strptime.
+        """
+        timestamp = "2006-12-31 23:59:58"
+        self.assertEqual(rn.parse_timestamp(timestamp), datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S"))
+        with self.assertRaises(ValueError):
+            rn.parse_timestamp("2006-12-31")
+
+    def test_parse_timestamp_rejects_other_layouts(self):
+        """
+        Test that 19 character strings in other layouts, like a time zone, raise the error of strptime.
+        """
+        for timestamp in ["2006-01-01 12:00+01", "2006-13-01 12:00:00", "2006-01-01T12:00:00"]:
+            with self.subTest(timestamp=timestamp):
+                with self.assertRaises(ValueError) as fast:
+                    rn.parse_timestamp(timestamp)
+                with self.assertRaises(ValueError) as slow:
+                    datetime.strptime(timestamp, "%Y-%m-%d %H:%M:%S")
+                self.assertEqual(str(fast.exception), str(slow.exception))
+
+
+class TestEditTable(unittest.TestCase):
+    def setUp(self):
+        self.file_path = write_sample_dump()
+        self.all_edits = rn.read_data(self.file_path)
+        self.table = rn.EditTable.from_file(self.file_path, chunk_size=3)
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_edit_table_rows(self):
+        """
+        Test that the table holds the same rows as read_data.
+        """
+        self.assertEqual(len(self.table), len(self.all_edits))
+        self.assertEqual(self.table.to_list(), self.all_edits)
+        self.assertEqual(self.table.users, ["carol", "bob", "alice"])
+
+    def test_edit_table_user_info(self):
+        """
+        Test that create_user_info gives the same counts and time stamps for a table.
+        """
+        edit_counts, user_info_dict = rn.create_user_info(self.all_edits)
+        table_counts, table_info_dict = rn.create_user_info(self.table)
+        self.assertEqual(table_counts, edit_counts)
+        for user, times in user_info_dict.items():
+            self.assertEqual(list(table_info_dict[user].astype(object)), times)
+
+    def test_edit_table_revert_network(self):
+        """
+        Test that create_revert_network gives the same network for a table.
+        """
+        _, user_info_dict = rn.create_user_info(self.all_edits)
+        expected = rn.create_revert_network(self.all_edits, user_info_dict)
+        _, table_info_dict = rn.create_user_info(self.table)
+        self.assertEqual(rn.create_revert_network(self.table, table_info_dict), expected)
+
+    def test_edit_table_save_load_empty_names(self):
+        """
+        Test that a table whose only user is empty, and whose title has a line break, round-trips through save and load.
+        """
+        table = rn.EditTable.from_edits([["Cluj\nIasi", datetime(2006, 1, 1), 0, 1, ""]])
+        directory = tempfile.mkdtemp()
+        table.save(directory)
+        loaded = rn.EditTable.load(directory)
+        shutil.rmtree(directory)
+        self.assertEqual(loaded.users, [""])
+        self.assertEqual(loaded.titles, ["Cluj\nIasi"])
+        self.assertEqual(loaded[0], ["Cluj\nIasi", datetime(2006, 1, 1), 0, 1, ""])
+
+
+
+class TestLoadEditsCached(unittest.TestCase):
+    def setUp(self):
+        self.file_path = write_sample_dump()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.remove(self.file_path)
+        shutil.rmtree(self.cache_dir)
+
+    def test_cache_round_trip(self):
+        """
+        Test that cold and warm loads give the same edits as read_data.
+        """
+        expected = rn.read_data(self.file_path)
+        self.assertEqual(rn.load_edits_cached(self.file_path, cache_dir=self.cache_dir).to_list(), expected)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+        self.assertEqual(rn.load_edits_cached(self.file_path, cache_dir=self.cache_dir).to_list(), expected)
+
+    def test_cache_rebuilt_when_file_changes(self):
+        """
+        Test that the cache is rebuilt after the source file changes.
+        """
+        rn.load_edits_cached(self.file_path, cache_dir=self.cache_dir)
+        with open(self.file_path, "a", encoding="utf-8") as file:
+            file.write("Iasi\t2006-01-03 10:00:00\t0\t1\tdan\n")
+        table = rn.load_edits_cached(self.file_path, cache_dir=self.cache_dir)
+        self.assertEqual(len(table), 9)
+        self.assertEqual(table[8], ["Iasi", datetime(2006, 1, 3, 10), 0, 1, "dan"])
+
+
+class TestSeniorityIndex(unittest.TestCase):
+    def setUp(self):
+        file_path = write_sample_dump()
+        self.all_edits = rn.read_data(file_path)
+        os.remove(file_path)
+        _, self.user_info_dict = rn.create_user_info(self.all_edits)
+        self.index = rn.SeniorityIndex(self.user_info_dict)
+
+    def test_seniority_matches_linear_scan(self):
+        """
+        Test that the index agrees with get_seniority_before_revert for every user at every edit time.
+        """
+        for user in self.user_info_dict:
+            for edit in self.all_edits:
+                expected = rn.get_seniority_before_revert(user, edit[1], self.user_info_dict)
+                self.assertEqual(self.index.seniority(user, edit[1]), expected)
+
+    def test_seniority_excludes_equal_time(self):
+        """
+        Test that an edit made at the revert time is not counted.
+        """
+        # bob edited at 11:00 and 13:00 and then at 09:00 the next day, which is the revert time
+        self.assertEqual(self.index.edit_counts_before(["bob"], [datetime(2006, 1, 2, 9)])[0], 2)
+        self.assertEqual(self.index.seniority("alice", datetime(2006, 1, 1, 10)), 0)
+
+    def test_revert_seniorities_batch(self):
+        """
+        Test that the batch call returns both seniorities for every revert.
+        """
+        times = [datetime(2006, 1, 1, 13), datetime(2007, 1, 1)]
+        reverter_seniority, reverted_seniority = self.index.revert_seniorities(["bob", "carol"], ["alice", "bob"], times)
+        self.assertEqual(list(reverter_seniority), [0.0, math.log10(2)])
+        self.assertEqual(list(reverted_seniority), [math.log10(3), math.log10(3)])
+
+
+
+class TestResolveReverts(unittest.TestCase):
+    def setUp(self):
+        file_path = write_sample_dump()
+        self.all_edits = rn.read_data(file_path)
+        os.remove(file_path)
+
+    def test_resolve_reverts(self):
+        """
+        Test that every revert of the sample is matched to the edit that followed the restored version.
+        """
+        revert_positions, reverted_positions, unresolved = rn.resolve_reverts(self.all_edits)
+        self.assertEqual(list(zip(revert_positions, reverted_positions)), [(5, 6), (2, 3), (0, 1)])
+        self.assertEqual(unresolved, [])
+
+    def test_resolve_reverts_unresolved(self):
+        """
+        Test that a revert to a version that never appeared in the article is reported, not scanned for.
+        """
+        # version 2 only exists in Cluj, so the first Bucuresti revert has nothing to restore
+        all_edits = [["Bucuresti", datetime(2006, 1, 3), 1, 2, "dan"]] + self.all_edits[5:]
+        _, _, unresolved = rn.resolve_reverts(all_edits)
+        self.assertEqual(unresolved, [0])
+
+    def test_create_revert_network_parallel(self):
+        """
+        Test that the parallel build gives the same network as the serial one, for a list and a table.
+        """
+        _, user_info_dict = rn.create_user_info(self.all_edits)
+        expected = rn.create_revert_network(self.all_edits, user_info_dict)
+        self.assertEqual(rn.create_revert_network_parallel(self.all_edits, user_info_dict, processes=2), expected)
+        table = rn.EditTable.from_edits(self.all_edits)
+        _, table_info_dict = rn.create_user_info(table)
+        self.assertEqual(rn.create_revert_network_parallel(table, table_info_dict, processes=2), expected)
+
+    def test_create_revert_network_parallel_compact_stats(self):
+        """
+        Test that the parallel build counts the same work as the serial one and can return an EdgeStore,
+        with a self-revert and an unresolved revert in the edits.
+        """
+        all_edits = [["Cluj", datetime(2006, 1, 2), 1, 1, "alice"], ["Iasi", datetime(2006, 1, 2), 1, 7, "dan"]] + self.all_edits
+        _, user_info_dict = rn.create_user_info(all_edits)
+        serial_stats, parallel_stats = rn.PipelineStats(), rn.PipelineStats()
+        expected = rn.create_revert_network(all_edits, user_info_dict, stats=serial_stats)
+        users, store = rn.create_revert_network_parallel(all_edits, user_info_dict, processes=2, compact=True, stats=parallel_stats)
+        self.assertEqual((users, store.to_network()), expected)
+        self.assertEqual(parallel_stats.counters, serial_stats.counters)
+        self.assertEqual(parallel_stats.counters["self_reverts"], 1)
+        self.assertEqual(parallel_stats.counters["unresolved_reverts"], 1)
+
+    def test_resolve_reverts_table(self):
+        """
+        Test that the vectorized resolver agrees with the loop for a table.
+        """
+        expected = rn.resolve_reverts(self.all_edits)
+        output = rn.resolve_reverts(rn.EditTable.from_edits(self.all_edits))
+        self.assertEqual([list(result) for result in output], [list(result) for result in expected])
+
+
+
+def make_edge(reverter, reverted, hour):
+    """
+    Make a network edge at the given hour after 2006-01-01.
+    """
+    return {
+        "Reverter": reverter,
+        "Reverted": reverted,
+        "Time stamp": datetime(2006, 1, 1) + timedelta(hours=hour),
+        "Reverter Seniority": 0,
+        "Reverted Seniority": 0,
+    }
+
+
+class TestCountAndLabelABBA(unittest.TestCase):
+    def setUp(self):
+        # alice reverts bob twice, bob answers within 24 hours, and carol reverts bob a day later
+        self.network = [
+            make_edge("alice", "bob", 0),
+            make_edge("alice", "bob", 2),
+            make_edge("bob", "alice", 20),
+            make_edge("carol", "bob", 30),
+            make_edge("bob", "carol", 60),
+        ]
+
+    def test_count_and_label(self):
+        """
+        Test that both starts answered by bob are counted and labelled.
+        """
+        count, network_sorted = rn.count_and_label_AB_BA(self.network)
+        self.assertEqual(count, 2)
+        self.assertEqual([edge["AB-BA"] for edge in network_sorted], [True, True, True, False, False])
+
+    def test_count_and_label_window(self):
+        """
+        Test that a longer window picks up the late answer to carol and a shorter one drops the first start.
+        """
+        count, _ = rn.count_and_label_AB_BA(self.network, window=timedelta(hours=30))
+        self.assertEqual(count, 3)
+        count, network_sorted = rn.count_and_label_AB_BA(self.network, window=timedelta(hours=19))
+        self.assertEqual(count, 1)
+        self.assertEqual([edge["AB-BA"] for edge in network_sorted], [False, True, True, False, False])
+
+    def test_count_and_label_unsorted(self):
+        """
+        Test that the network is sorted by time stamp before counting.
+        """
+        count, network_sorted = rn.count_and_label_AB_BA(self.network[::-1])
+        self.assertEqual(count, 2)
+        self.assertEqual([edge["Time stamp"] for edge in network_sorted], [edge["Time stamp"] for edge in self.network])
+
+
+
+class TestCountAndLabelMotifs(unittest.TestCase):
+    def setUp(self):
+        # alice reverts bob, bob reverts carol, carol reverts alice and alice reverts bob again
+        self.network = [
+            make_edge("alice", "bob", 0),
+            make_edge("bob", "carol", 1),
+            make_edge("carol", "alice", 2),
+            make_edge("alice", "bob", 30),
+        ]
+
+    def test_count_and_label_motifs(self):
+        """
+        Test the counts and labels of every motif on a three-user cycle.
+        """
+        counts, network_sorted = rn.count_and_label_motifs(self.network)
+        self.assertEqual(counts, {"AB-BA": 0, "AB-AB": 0, "AB-BC": 2, "AB-CA": 1, "AB-BC-CA": 1})
+        self.assertEqual([edge["AB-BC-CA"] for edge in network_sorted], [True, True, True, False])
+        self.assertEqual([edge["AB-CA"] for edge in network_sorted], [True, False, True, False])
+        self.assertEqual([edge["AB-BA"] for edge in network_sorted], [False, False, False, False])
+
+    def test_count_and_label_motifs_window(self):
+        """
+        Test that a longer window picks up the repeated revert and a chosen subset of motifs is counted.
+        """
+        counts, network_sorted = rn.count_and_label_motifs(self.network, motifs=["AB-AB"], window=timedelta(hours=30))
+        self.assertEqual(counts, {"AB-AB": 1})
+        self.assertEqual([edge["AB-AB"] for edge in network_sorted], [True, False, False, True])
+        self.assertNotIn("AB-BA", network_sorted[0])
+
+    def test_count_and_label_motifs_matches_AB_BA(self):
+        """
+        Test that the AB-BA motif gives the same count and labels as count_and_label_AB_BA.
+        """
+        network = [make_edge("alice", "bob", 0), make_edge("alice", "bob", 2), make_edge("bob", "alice", 20)]
+        count, network_sorted = rn.count_and_label_AB_BA([dict(edge) for edge in network])
+        counts, motif_sorted = rn.count_and_label_motifs(network, motifs=["AB-BA"])
+        self.assertEqual(counts["AB-BA"], count)
+        self.assertEqual([edge["AB-BA"] for edge in motif_sorted], [edge["AB-BA"] for edge in network_sorted])
+
+    def test_count_and_label_motifs_heavy_user(self):
+        """
+        Test a burst around one heavy user: hub reverts many users, each of them reverts hub back
+        and then reverts carol, and carol reverts hub, so every motif involves all the users at once.
+        """
+        n = 200
+        users = [f"user_{i}" for i in range(n)]
+        network = (
+            [make_edge("hub", user, i / 100) for i, user in enumerate(users)]
+            + [make_edge(user, "hub", 3 + i / 100) for i, user in enumerate(users)]
+            + [make_edge(user, "carol", 6 + i / 100) for i, user in enumerate(users)]
+            + [make_edge("carol", "hub", 9)]
+        )
+        counts, network_sorted = rn.count_and_label_motifs(network)
+        self.assertEqual(counts, {"AB-BA": n, "AB-AB": 0, "AB-BC": 2 * n, "AB-CA": n, "AB-BC-CA": n})
+        self.assertEqual([edge["AB-BC-CA"] for edge in network_sorted], [True] * n + [False] * n + [True] * (n + 1))
+        self.assertEqual([edge["AB-CA"] for edge in network_sorted], [True] * (2 * n) + [False] * n + [True])
+
+        count, ab_ba_sorted = rn.count_and_label_AB_BA([dict(edge) for edge in network])
+        self.assertEqual(counts["AB-BA"], count)
+        self.assertEqual([edge["AB-BA"] for edge in network_sorted], [edge["AB-BA"] for edge in ab_ba_sorted])
+
+    def test_unknown_motif(self):
+        """
+        Test that a ValueError is raised for a motif that is not supported.
+        """
+        with self.assertRaises(ValueError):
+            rn.MotifCounter(motifs=["AB-XY"])
+
+
+class TestSeniorityDiffs(unittest.TestCase):
+    def setUp(self):
+        self.network = [make_edge("alice", "bob", 0), make_edge("bob", "alice", 5), make_edge("carol", "bob", 1)]
+        for edge, (reverter_seniority, reverted_seniority) in zip(self.network, [(1.0, 0.5), (0.25, 1.0), (2.0, 0.0)]):
+            edge["Reverter Seniority"] = reverter_seniority
+            edge["Reverted Seniority"] = reverted_seniority
+        _, self.network_sorted = rn.count_and_label_AB_BA(self.network)
+
+    def test_seniority_diff_arrays(self):
+        """
+        Test that the arrays hold the same differences as get_seniority_diffs.
+        """
+        ab_ba_diffs, other_diffs = rn.get_seniority_diffs(self.network_sorted)
+        ab_ba_array, other_array = rn.seniority_diff_arrays(self.network_sorted)
+        self.assertEqual(list(ab_ba_array), ab_ba_diffs)
+        self.assertEqual(list(other_array), other_diffs)
+        store_ab_ba, store_other = rn.seniority_diff_arrays(rn.EdgeStore.from_network(self.network_sorted))
+        self.assertEqual(list(store_ab_ba), ab_ba_diffs)
+        self.assertEqual(list(store_other), other_diffs)
+
+    def test_seniority_diff_arrays_unlabelled(self):
+        """
+        Test that edges without an AB-BA label count as other reverts.
+        """
+        ab_ba_array, other_array = rn.seniority_diff_arrays([make_edge("alice", "bob", 0)])
+        self.assertEqual(len(ab_ba_array), 0)
+        self.assertEqual(len(other_array), 1)
+
+    def test_summary_streaming(self):
+        """
+        Test that a summary updated in chunks and merged gives the exact means and the right bins.
+        """
+        first = rn.SeniorityDiffSummary(bins=4, value_range=(0.0, 2.0))
+        second = rn.SeniorityDiffSummary(bins=4, value_range=(0.0, 2.0))
+        first.update(self.network_sorted[:2])
+        second.update(self.network_sorted[2:])
+        first.merge(second)
+        self.assertEqual(first.mean("AB-BA"), 0.625)
+        self.assertEqual(first.mean("other"), 2.0)
+        counts, bin_edges = first.histogram("AB-BA")
+        self.assertEqual(list(counts), [0, 2, 0, 0])
+        self.assertEqual(list(bin_edges), [0.0, 0.5, 1.0, 1.5, 2.0])
+        self.assertEqual(first.quantile("other", 0.5), 2.0)
+        self.assertTrue(math.isnan(rn.SeniorityDiffSummary().mean("AB-BA")))
+
+
+class TestRevertGraph(unittest.TestCase):
+    def setUp(self):
+        self.network = [
+            make_edge("alice", "bob", 0),
+            make_edge("alice", "bob", 1),
+            make_edge("bob", "alice", 2),
+            make_edge("carol", "bob", 3),
+            make_edge("dan", "erin", 4),
+        ]
+        self.network[3]["Reverter Seniority"] = 1.5
+        self.unique_users = {"alice", "bob", "carol", "dan", "erin"}
+
+    def test_to_sparse_adjacency(self):
+        """
+        Test that repeated reverts are summed and users are sorted by name.
+        """
+        matrix, users = revert_graph.to_sparse_adjacency(self.network, self.unique_users)
+        self.assertEqual(users, ["alice", "bob", "carol", "dan", "erin"])
+        self.assertEqual(matrix[0, 1], 2)
+        self.assertEqual(matrix.nnz, 4)
+        matrix, _ = revert_graph.to_sparse_adjacency(self.network, self.unique_users, weight="seniority")
+        self.assertEqual(matrix[2, 1], 1.5)
+        store_matrix, store_users = revert_graph.to_sparse_adjacency(rn.EdgeStore.from_network(self.network))
+        self.assertEqual(store_users, ["alice", "bob", "carol", "dan", "erin"])
+        self.assertEqual((store_matrix != revert_graph.to_sparse_adjacency(self.network)[0]).nnz, 0)
+
+    def test_graph_analytics(self):
+        """
+        Test degrees, reciprocity, components and that PageRank sums to 1.
+        """
+        matrix, _ = revert_graph.to_sparse_adjacency(self.network, self.unique_users)
+        degrees = revert_graph.degree_distributions(matrix)
+        self.assertEqual(list(degrees["in_degree"]), [1, 2, 0, 0, 1])
+        self.assertEqual(list(degrees["out_strength"]), [2, 1, 1, 1, 0])
+        self.assertEqual(revert_graph.reciprocity(matrix), 0.5)
+        count, labels = revert_graph.connected_components(matrix)
+        self.assertEqual(count, 2)
+        self.assertEqual(labels[0], labels[2])
+        rank = revert_graph.pagerank(matrix)
+        self.assertAlmostEqual(rank.sum(), 1.0)
+        self.assertEqual(int(np.argmax(rank)), 1)
+
+    def test_zero_weight_edges(self):
+        """
+        Test that a reciprocal pair with no difference in seniority still counts as edges
+        under weight='seniority', so the analytics agree with the count matrix.
+        """
+        network = [make_edge("a", "b", 0), make_edge("b", "a", 1), make_edge("c", "a", 2)]
+        # 0 against log10(1) for the reciprocal pair, a real difference for the last revert
+        for edge in network[:2]:
+            edge["Reverter Seniority"] = 0
+            edge["Reverted Seniority"] = np.log10(1)
+        network[2]["Reverter Seniority"] = 1.0
+        network[2]["Reverted Seniority"] = 0.0
+
+        counts, _ = revert_graph.to_sparse_adjacency(network, weight="count")
+        seniority, _ = revert_graph.to_sparse_adjacency(network, weight="seniority")
+        self.assertAlmostEqual(revert_graph.reciprocity(seniority), 2 / 3)
+        self.assertEqual(revert_graph.reciprocity(seniority), revert_graph.reciprocity(counts))
+        count_degrees = revert_graph.degree_distributions(counts)
+        seniority_degrees = revert_graph.degree_distributions(seniority)
+        for key in ("out_degree", "in_degree"):
+            self.assertEqual(list(seniority_degrees[key]), list(count_degrees[key]))
+        self.assertEqual(list(seniority_degrees["out_strength"]), [0.0, 0.0, 1.0])
+        self.assertEqual(revert_graph.connected_components(seniority, connection='strong')[0], 2)
+
+    def test_invalid_weight(self):
+        """
+        Test that a ValueError is raised for an unknown weight.
+        """
+        with self.assertRaises(ValueError):
+            revert_graph.to_sparse_adjacency(self.network, weight="time")
+
+
+class TestEdgeStore(unittest.TestCase):
+    def setUp(self):
+        file_path = write_sample_dump()
+        self.all_edits = rn.read_data(file_path)
+        os.remove(file_path)
+        _, self.user_info_dict = rn.create_user_info(self.all_edits)
+
+    def test_user_vocab(self):
+        """
+        Test that names get dense ids in order of first appearance.
+        """
+        vocab = rn.UserVocab(["bob", "alice"])
+        self.assertEqual(list(vocab.encode(["alice", "carol", "bob"])), [1, 2, 0])
+        self.assertEqual(vocab.decode([2, 0]), ["carol", "bob"])
+        self.assertEqual(len(vocab), 3)
+
+    def test_compact_network(self):
+        """
+        Test that the compact network gives the same dictionaries as the list network.
+        """
+        unique_users, network = rn.create_revert_network(self.all_edits, self.user_info_dict)
+        compact_users, store = rn.create_revert_network(self.all_edits, self.user_info_dict, compact=True)
+        self.assertEqual(compact_users, unique_users)
+        self.assertEqual(len(store), len(network))
+        self.assertEqual(store.to_network(), network)
+        self.assertEqual(store.reverters.dtype, np.int32)
+
+    def test_count_and_label_store(self):
+        """
+        Test that an EdgeStore gets the same AB-BA count and labels as the list of dictionaries.
+        """
+        network = [make_edge("alice", "bob", 0), make_edge("bob", "alice", 5), make_edge("carol", "bob", 1)]
+        count, network_sorted = rn.count_and_label_AB_BA([dict(edge) for edge in network])
+        store_count, store_sorted = rn.count_and_label_AB_BA(rn.EdgeStore.from_network(network))
+        self.assertEqual(store_count, count)
+        self.assertEqual(list(store_sorted.ab_ba), [True, False, True])
+        self.assertEqual(store_sorted.to_network(), network_sorted)
+
+
+class TestRevertIndex(unittest.TestCase):
+    def setUp(self):
+        self.network = [
+            make_edge("carol", "bob", 30),
+            make_edge("alice", "bob", 0),
+            make_edge("bob", "alice", 20),
+            make_edge("alice", "carol", 10),
+        ]
+        self.index = rn.RevertIndex(self.network)
+        self.start = datetime(2006, 1, 1)
+
+    def test_between(self):
+        """
+        Test that a time range returns the edges inside it in time order, end excluded.
+        """
+        positions = self.index.between(self.start + timedelta(hours=10), self.start + timedelta(hours=30))
+        self.assertEqual(list(positions), [3, 2])
+        self.assertEqual(list(self.index.between()), [1, 3, 2, 0])
+
+    def test_user_queries(self):
+        """
+        Test the reverts by, against and involving a user.
+        """
+        self.assertEqual(list(self.index.by_reverter("alice")), [1, 3])
+        self.assertEqual(list(self.index.against("bob", start=self.start + timedelta(hours=1))), [0])
+        self.assertEqual(list(self.index.involving("alice", end=self.start + timedelta(hours=25))), [1, 3, 2])
+        self.assertEqual(len(self.index.by_reverter("nobody")), 0)
+        self.assertEqual(self.index.edges([2])[0]["Reverter"], "bob")
+
+    def test_queries_are_views(self):
+        """
+        Test that range and per-user queries slice the index instead of copying.
+        """
+        self.assertIs(self.index.between().base, self.index.time_order)
+        self.assertIsNotNone(self.index.by_reverter("alice").base)
+
+
+class TestRevertNetworkState(unittest.TestCase):
+    def setUp(self):
+        file_path = write_sample_dump()
+        self.all_edits = rn.read_data(file_path)
+        os.remove(file_path)
+
+    def test_state_updates_match_full_build(self):
+        """
+        Test that adding the sample in two deltas gives the same network and AB-BA count as a full run.
+        """
+        _, user_info_dict = rn.create_user_info(self.all_edits)
+        unique_users, network = rn.create_revert_network(self.all_edits, user_info_dict)
+        count, network_sorted = rn.count_and_label_AB_BA(network)
+
+        state = rn.RevertNetworkState()
+        # the edits of 2006-01-02 arrive in the second delta
+        state.update(self.all_edits[2:])
+        new_edges = state.update(self.all_edits[:2])
+        self.assertEqual(len(new_edges), 1)
+        self.assertEqual(state.unique_users, unique_users)
+        self.assertEqual(state.network_sorted, network_sorted)
+        self.assertEqual(state.ab_ba_sequences, count)
+
+    def test_state_save_and_load(self):
+        """
+        Test that a saved state can be loaded and updated further.
+        """
+        state = rn.RevertNetworkState()
+        state.update(self.all_edits[2:])
+        handle, file_path = tempfile.mkstemp(suffix=".pkl")
+        os.close(handle)
+        state.save(file_path)
+        loaded = rn.RevertNetworkState.load(file_path)
+        os.remove(file_path)
+        self.assertEqual(loaded.network, state.network)
+        loaded.update(self.all_edits[:2])
+        self.assertEqual(len(loaded.network), 3)
+
+
+class TestBenchmarkReverts(unittest.TestCase):
+
+    def test_generated_log_is_readable(self):
+        """
+        Test that every revert of a generated edit log restores an earlier version of its article.
+        """
+        handle, file_path = tempfile.mkstemp(suffix=".txt")
+        os.close(handle)
+        benchmark_reverts.generate_edit_log(file_path, 2000, n_users=50, revert_rate=0.2, seed=1)
+        all_edits = rn.read_data(file_path)
+        os.remove(file_path)
+        self.assertEqual(len(all_edits), 2000)
+        edit_counts, user_info_dict = rn.create_user_info(all_edits)
+        unique_users, network = rn.create_revert_network(all_edits, user_info_dict)
+        self.assertEqual(len(network), sum(edit[2] for edit in all_edits))
+        self.assertGreater(len(network), 0)
+
+    def test_run_and_compare(self):
+        """
+        Test that a benchmark run records every stage and that a slower run is reported.
+        """
+        records = benchmark_reverts.run_benchmarks([500], output=None, memory=True, n_users=20)
+        self.assertEqual([record["stage"] for record in records], benchmark_reverts.STAGES)
+        self.assertTrue(all(record["peak_bytes"] >= 0 for record in records))
+        slower = [dict(record, seconds=record["seconds"] * 2 + 1) for record in records]
+        self.assertEqual(len(benchmark_reverts.compare_results(records, slower)), len(records))
+        self.assertEqual(benchmark_reverts.compare_results(records, records), [])
+
+
+class TestPipelineStats(unittest.TestCase):
+
+    def test_stages_and_counters(self):
+        """
+        Test that every stage of the sample pipeline is recorded and its work counted.
+        """
+        file_path = write_sample_dump()
+        names = []
+        stats = rn.PipelineStats(memory=True, callback=lambda name, record: names.append(name))
+        all_edits = rn.read_data(file_path, stats=stats)
+        os.remove(file_path)
+        _, user_info_dict = rn.create_user_info(all_edits, stats=stats)
+        _, network = rn.create_revert_network(all_edits, user_info_dict, stats=stats)
+        count, network_sorted = rn.count_and_label_AB_BA(network, stats=stats)
+        rn.get_seniority_diffs(network_sorted, stats=stats)
+
+        self.assertEqual(names, ["read_data", "create_user_info", "create_revert_network", "count_and_label_AB_BA", "get_seniority_diffs"])
+        self.assertTrue(all(record["peak_bytes"] is not None for record in stats.stages.values()))
+        self.assertEqual(stats.counters["lines_parsed"], 8)
+        self.assertEqual(stats.counters["reverts_seen"], 3)
+        self.assertEqual(stats.counters["seniority_lookups"], 6)
+        self.assertEqual(stats.counters["ab_ba_comparisons"], 4)
+        # the results don't change when the stages are measured
+        self.assertEqual(count, rn.count_and_label_AB_BA(network)[0])
+
+    def test_other_read_paths(self):
+        """
+        Test that EditTable.from_file, load_edits_cached (cold and warm) and read_dumps record the
+        read_data stage and the lines parsed like read_data.
+        """
+        file_path = write_sample_dump()
+        cache_dir = tempfile.mkdtemp()
+        readers = [
+            lambda stats: rn.EditTable.from_file(file_path, stats=stats),
+            lambda stats: rn.load_edits_cached(file_path, cache_dir=cache_dir, stats=stats),
+            lambda stats: rn.load_edits_cached(file_path, cache_dir=cache_dir, stats=stats),
+            lambda stats: rn.read_dumps(file_path, stats=stats),
+        ]
+        for reader in readers:
+            stats = rn.PipelineStats()
+            self.assertEqual(len(reader(stats)), 8)
+            self.assertEqual(stats.stages["read_data"]["calls"], 1)
+            self.assertEqual(stats.counters["lines_parsed"], 8)
+        os.remove(file_path)
+        shutil.rmtree(cache_dir)
+
+    def test_self_and_unresolved_reverts(self):
+        """
+        Test that self-reverts and unresolved reverts are counted, also for an EditTable.
+        """
+        all_edits = [
+            ["Iasi", datetime(2006, 1, 3), 1, 1, "x"],
+            ["Iasi", datetime(2006, 1, 2), 0, 2, "x"],
+            ["Iasi", datetime(2006, 1, 1), 0, 1, "y"],
+            ["Arad", datetime(2006, 1, 1), 1, 9, "z"],
+        ]
+        _, user_info_dict = rn.create_user_info(all_edits)
+        for edits in (all_edits, rn.EditTable.from_edits(all_edits)):
+            stats = rn.PipelineStats()
+            _, network = rn.create_revert_network(edits, user_info_dict, stats=stats)
+            self.assertEqual(network, [])
+            self.assertEqual(stats.counters["reverts_seen"], 2)
+            self.assertEqual(stats.counters["self_reverts"], 1)
+            self.assertEqual(stats.counters["unresolved_reverts"], 1)
+            self.assertEqual(stats.stages["create_revert_network"]["calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()